@@ -0,0 +1,13 @@
+# ASGI entry point: the dashboard plus the /assets/ route for the widget
+# bundle, the /images/ route for the space image thumbnails, the bottom
+# ticker's /ticker/events stream and the Prometheus /metrics endpoint.
+# Start it with `streamlit run app.py`.
+
+import streamlit as st
+
+import assets
+import live
+import metrics
+import space_images
+
+app = st.App("dashboard.py", routes=assets.routes() + space_images.routes() + live.routes() + metrics.routes())
@@ -0,0 +1,183 @@
+# Versioned static assets for the components.html widgets.
+#
+# The widget styles, scripts and the VT323 font live under widgets/ and are
+# served from /assets/ under content-hash file names with a one-year
+# immutable Cache-Control, so after the first load a browser only receives
+# the few hundred bytes of markup that reference them. The routes are mounted
+# by app.py; run the dashboard with `streamlit run app.py`. Until the font
+# has been fetched into widgets/fonts/, widgets link Google Fonts' VT323
+# stylesheet instead.
+#
+# The widgets in WIDGETS share one component, the widget host: a single
+# document with a section per widget, one stylesheet and one script
+# (widgets.css and widgets.js, the host runtime in host.js followed by each
+# widget's own file), and a JSON config the script mounts them from. The
+# ticker keeps its own component.
+#
+#   python assets.py             list the hashed asset names
+#   python assets.py fetch-font  download VT323 into widgets/fonts/ (once)
+
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+
+WIDGET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "widgets")
+FONT_PATH = os.path.join(WIDGET_DIR, "fonts", "VT323-Regular.woff2")
+FONT_CSS_URL = "https://fonts.googleapis.com/css2?family=VT323&display=swap"
+ROUTE_PREFIX = "/assets/"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Widgets whose markup uses the VT323 font.
+FONT_WIDGETS = {"clock", "pomodoro"}
+
+# (widget, section height, options for its script) in page order.
+WIDGETS = [
+    ("clock", 300, {}),
+    ("dino", 200, {}),
+    ("rocket", 400, {}),
+    ("pomodoro", 450, {"duration": 25 * 60}),
+    ("tv", 600, {}),
+]
+HOST_HEIGHT = sum(height for _, height, _ in WIDGETS)
+
+
+def _content_type(name):
+    if name.endswith(".woff2"):
+        return "font/woff2"
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+class Bundle:
+    def __init__(self, widget_dir=WIDGET_DIR, font_path=FONT_PATH):
+        self.widget_dir = widget_dir
+        self.files = {}  # hashed name -> (content, content type)
+        self.names = {}  # source name -> hashed name
+        hosted = ["host"] + [widget for widget, _, _ in WIDGETS]
+        for name in sorted(os.listdir(widget_dir)):
+            if name.endswith((".css", ".js")) and os.path.splitext(name)[0] not in hosted:
+                with open(os.path.join(widget_dir, name), "rb") as f:
+                    self._add(name, f.read())
+        for ext in (".css", ".js"):
+            parts = []
+            for stem in hosted:
+                path = os.path.join(widget_dir, stem + ext)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        parts.append(f.read())
+            self._add("widgets" + ext, b"\n".join(parts))
+        if os.path.exists(font_path):
+            with open(font_path, "rb") as f:
+                font = self._add(os.path.basename(font_path), f.read())
+            font_face = (
+                "@font-face {\n"
+                "    font-family: 'VT323';\n"
+                "    font-display: swap;\n"
+                f"    src: url('{font}') format('woff2');\n"
+                "}\n"
+            )
+            self._add("vt323.css", font_face.encode())
+
+    def _add(self, name, content):
+        stem, ext = os.path.splitext(name)
+        hashed = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+        self.files[hashed] = (content, _content_type(name))
+        self.names[name] = hashed
+        return hashed
+
+    def url(self, name, prefix=None):
+        # `prefix` replaces the server's /assets/ route, e.g. "assets/" for a
+        # static export that keeps the files next to its page.
+        if prefix is None:
+            import streamlit as st
+
+            base = st.get_option("server.baseUrlPath").strip("/")
+            prefix = (f"/{base}" if base else "") + ROUTE_PREFIX
+        return f"{prefix}{self.names[name]}"
+
+    def font_link(self, prefix=None):
+        # The local VT323 stylesheet, or Google Fonts' until
+        # `python assets.py fetch-font` has saved the font.
+        if "vt323.css" in self.names:
+            return f'<link rel="stylesheet" href="{self.url("vt323.css", prefix)}">'
+        return f'<link rel="stylesheet" href="{FONT_CSS_URL}">'
+
+    def widget_html(self, widget, prefix=None, extra=""):
+        # Markup for components.html: the widget's own HTML plus references
+        # to its hashed stylesheet and script; `extra` goes in front of the
+        # script.
+        parts = []
+        if widget in FONT_WIDGETS:
+            parts.append(self.font_link(prefix))
+        if f"{widget}.css" in self.names:
+            parts.append(f'<link rel="stylesheet" href="{self.url(widget + ".css", prefix)}">')
+        with open(os.path.join(self.widget_dir, f"{widget}.html"), encoding="utf-8") as f:
+            parts.append(f.read())
+        if extra:
+            parts.append(extra)
+        if f"{widget}.js" in self.names:
+            parts.append(f'<script src="{self.url(widget + ".js", prefix)}"></script>')
+        return "\n".join(parts)
+
+    def host_html(self, widgets=WIDGETS, prefix=None):
+        # Markup for the widget host: a section of the given height per
+        # widget, the shared bundle and the config widgets.js mounts from.
+        parts = []
+        if FONT_WIDGETS & {widget for widget, _, _ in widgets}:
+            parts.append(self.font_link(prefix))
+        parts.append(f'<link rel="stylesheet" href="{self.url("widgets.css", prefix)}">')
+        parts.append('<div class="widget-host">')
+        for widget, height, _ in widgets:
+            with open(os.path.join(self.widget_dir, f"{widget}.html"), encoding="utf-8") as f:
+                markup = f.read()
+            parts.append(f'<section class="widget" data-widget="{widget}" style="height: {height}px">\n{markup}</section>')
+        parts.append("</div>")
+        config = {"widgets": [{"name": widget, "options": options} for widget, _, options in widgets]}
+        config_json = json.dumps(config).replace("</", "<\\/")
+        parts.append(f'<script type="application/json" id="widget-config">{config_json}</script>')
+        parts.append(f'<script src="{self.url("widgets.js", prefix)}"></script>')
+        return "\n".join(parts)
+
+
+bundle = Bundle()
+
+
+def routes():
+    from starlette.responses import Response
+    from starlette.routing import Route
+
+    async def serve_asset(request):
+        entry = bundle.files.get(request.path_params["name"])
+        if entry is None:
+            return Response("Not found", status_code=404)
+        content, content_type = entry
+        return Response(content, media_type=content_type, headers={"Cache-Control": CACHE_CONTROL})
+
+    return [Route(ROUTE_PREFIX + "{name}", serve_asset)]
+
+
+def fetch_font():
+    import requests
+
+    # Google serves woff2 only to browsers it recognises.
+    headers = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36"}
+    css = requests.get(FONT_CSS_URL, headers=headers, timeout=10).text
+    match = re.search(r"url\((https://[^)]+\.woff2)\)", css)
+    if match is None:
+        raise RuntimeError("no woff2 source in the Google Fonts stylesheet")
+    font = requests.get(match.group(1), timeout=10)
+    font.raise_for_status()
+    os.makedirs(os.path.dirname(FONT_PATH), exist_ok=True)
+    with open(FONT_PATH, "wb") as f:
+        f.write(font.content)
+    print(f"saved {FONT_PATH} ({len(font.content)} bytes)")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["fetch-font"]:
+        fetch_font()
+    else:
+        for name, hashed in sorted(bundle.names.items()):
+            print(f"{name:24} {ROUTE_PREFIX}{hashed}  ({len(bundle.files[hashed][0])} bytes)")
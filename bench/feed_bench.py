@@ -0,0 +1,74 @@
+# Headline parsing: feedparser against the streaming reader in feeds.py.
+#
+# Both parse the recorded r/space feed and keep the first 10 non-imgur
+# titles. Reports the median parse time and the peak traced allocation of
+# each, and checks that they return the same headlines.
+#
+#   python bench/feed_bench.py
+#   python bench/feed_bench.py --fixture other.rss --limit 25 --repeat 500
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FIXTURE = os.path.join(BENCH_DIR, "fixtures", "reddit_space.rss")
+
+sys.path.insert(0, REPO_DIR)
+import feeds  # noqa: E402
+
+
+def with_feedparser(body, limit):
+    import feedparser
+
+    feed = feedparser.parse(body)
+    return [entry.title for entry in feed.entries if "imgur.com" not in entry.link][:limit]
+
+
+def with_stream(body, limit):
+    chunks = (body[i:i + feeds.CHUNK_SIZE] for i in range(0, len(body), feeds.CHUNK_SIZE))
+    headlines = feeds.parse_headlines(chunks, limit, keep=feeds.exclude_links("imgur.com"))
+    return [headline.title for headline in headlines]
+
+
+def measure(parse, body, limit, repeat):
+    parse(body, limit)  # warm imports and caches
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(body, limit)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    headlines = parse(body, limit)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return headlines, statistics.median(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare feedparser with the streaming headline reader.")
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(args.fixture, "rb") as f:
+        body = f.read()
+    results = {}
+    print(f"{'parser':12} {'median ms':>10} {'peak KiB':>10}")
+    for name, parse in (("feedparser", with_feedparser), ("stream", with_stream)):
+        headlines, median, peak = measure(parse, body, args.limit, args.repeat)
+        results[name] = headlines
+        print(f"{name:12} {median * 1000:10.3f} {peak / 1024:10.1f}")
+    if results["feedparser"] != results["stream"]:
+        print("headlines differ")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# Import-time breakdown for the dashboard's cold start.
+#
+# Runs a fresh interpreter with `-X importtime`, imports Streamlit and the
+# modules app.py imports first (the server has already loaded them before the
+# script runs) and then the modules dashboard.py imports at the top, and
+# reports only what those cost, i.e. what loads before the first paint. Rows are
+# the same self/cumulative microsecond columns as `-X importtime`, sorted by
+# cumulative time, and the total is checked against a budget.
+#
+#   python bench/import_report.py
+#   python bench/import_report.py --modules sources,quotes --top 30
+#   python bench/import_report.py --budget-ms 150
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DASHBOARD = os.path.join(REPO_DIR, "dashboard.py")
+APP = os.path.join(REPO_DIR, "app.py")
+
+PRELOADED = ("streamlit", "streamlit.components.v1")
+MARKER = "--- dashboard imports ---"
+BUDGET_MS = 100.0
+
+
+def dashboard_imports(path=DASHBOARD):
+    # Modules imported at the top level of the script, in order, without
+    # Streamlit's own.
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            if name.split(".")[0] != "streamlit" and name not in modules:
+                modules.append(name)
+    return modules
+
+
+def parse_importtime(stderr):
+    # [(depth, module, self_us, cumulative_us)] for every line after MARKER.
+    rows = []
+    seen_marker = False
+    for line in stderr.splitlines():
+        if line == MARKER:
+            seen_marker = True
+            continue
+        if not seen_marker or not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(modules=None, python=sys.executable):
+    modules = modules or dashboard_imports()
+    code = "; ".join(
+        [f"import {name}" for name in PRELOADED + tuple(dashboard_imports(APP))]
+        + [f"import sys; print({MARKER!r}, file=sys.stderr, flush=True)"]
+        + [f"import {name}" for name in modules]
+    )
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=REPO_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def total_ms(rows):
+    return sum(cumulative for depth, _, _, cumulative in rows if depth == 0) / 1000
+
+
+def print_report(rows, top=20, budget_ms=None):
+    print(f"{'self [us]':>10} | {'cumulative':>10} | imported package")
+    for depth, name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[3])[:top]:
+        print(f"{self_us:10d} | {cumulative_us:10d} | {'  ' * depth}{name}")
+    line = f"total: {total_ms(rows):.1f} ms"
+    if budget_ms is not None:
+        line += f" (budget {budget_ms:.0f} ms)"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time for the dashboard's top-level imports.")
+    parser.add_argument("--modules", help="comma-separated modules to import instead of dashboard.py's")
+    parser.add_argument("--top", type=int, default=20, help="number of rows to show")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="fail when the total is over this")
+    args = parser.parse_args()
+
+    modules = args.modules.split(",") if args.modules else None
+    rows = measure(modules)
+    print_report(rows, args.top, args.budget_ms)
+    if total_ms(rows) > args.budget_ms:
+        print("over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
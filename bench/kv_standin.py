@@ -0,0 +1,124 @@
+# Local stand-in for the Redis server behind snapshot_store.RedisStore.
+#
+# Speaks enough of the Redis protocol (RESP2) for redis-py and the store:
+# PING, GET, SET with NX/XX/EX/PX, DEL and EXISTS, with key expiry. Other
+# commands get an error, which redis-py tolerates for its connection setup.
+# Counts commands so multi-replica runs can show how often the store is hit.
+#
+#   python bench/kv_standin.py --port 6390
+#   DASHBOARD_STORE=redis://127.0.0.1:6390/0 streamlit run app.py
+
+import argparse
+import threading
+import time
+from collections import Counter
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+
+
+class _TCPServer(ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+def _bulk(value):
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class KVStandin:
+    def __init__(self, host="127.0.0.1", port=0):
+        self._lock = threading.Lock()
+        self._data = {}  # key -> (value, expires_at or None)
+        self.counts = Counter()
+        self.httpd = _TCPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="kv", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _get(self, key):
+        value, expires_at = self._data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def execute(self, args):
+        # One command as a list of bytes -> RESP reply bytes.
+        command = args[0].decode().upper()
+        with self._lock:
+            self.counts[command] += 1
+            if command == "PING":
+                return b"+PONG\r\n"
+            if command == "GET" and len(args) == 2:
+                return _bulk(self._get(args[1]))
+            if command == "SET" and len(args) >= 3:
+                return self._set(args[1], args[2], [arg.decode().upper() for arg in args[3:]])
+            if command in ("DEL", "EXISTS"):
+                found = [key for key in args[1:] if self._get(key) is not None]
+                if command == "DEL":
+                    for key in found:
+                        del self._data[key]
+                return b":%d\r\n" % len(found)
+        return b"-ERR unknown command '%s'\r\n" % args[0]
+
+    def _set(self, key, value, options):
+        expires_at = None
+        if "EX" in options or "PX" in options:
+            unit = "EX" if "EX" in options else "PX"
+            amount = float(options[options.index(unit) + 1])
+            expires_at = time.monotonic() + (amount if unit == "EX" else amount / 1000)
+        exists = self._get(key) is not None
+        if ("NX" in options and exists) or ("XX" in options and not exists):
+            return b"$-1\r\n"
+        self._data[key] = (value, expires_at)
+        return b"+OK\r\n"
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(StreamRequestHandler):
+            def handle(self):
+                while True:
+                    args = self._read_command()
+                    if not args:
+                        return
+                    self.wfile.write(standin.execute(args))
+                    self.wfile.flush()
+
+            def _read_command(self):
+                line = self.rfile.readline()
+                if not line.startswith(b"*"):
+                    return None
+                args = []
+                for _ in range(int(line[1:])):
+                    size = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(size + 2)[:-2])
+                return args
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a minimal Redis stand-in for the shared store.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    standin = KVStandin(args.host, args.port)
+    print(f"kv stand-in on {standin.url}")
+    standin.httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+# Load test: many dashboard viewers against one local Streamlit server.
+#
+# Starts the replay server and a real `streamlit run app.py` (in a child
+# process with Yahoo redirected to the replay server and a fresh snapshot
+# store), then opens N simulated sessions over the Streamlit websocket.
+# Each session runs the script once, keeps the /ticker/events stream open
+# like the ticker component does, and reruns the script every --interval
+# seconds: all sessions at the same instant with --sync, or spread over the
+# interval at seeded offsets otherwise. Sessions report the hashes of the
+# elements they have received with every rerun, as a browser does, so
+# unchanged elements come back as references.
+#
+# Reports p50/p95/p99 latency of the first run and of reruns (request sent to
+# script_finished), the server's CPU and RSS sampled from /proc (Linux), and
+# upstream requests per source. With the same arguments and seed, the
+# schedule of reruns is identical between runs, so two commits can be compared
+# with --json and --baseline.
+#
+#   python bench/load_test.py --sessions 50 --interval 10 --duration 60
+#   python bench/load_test.py --sessions 500 --sync --latency nws=0.3 --json load.json
+#   python bench/load_test.py --sessions 500 --sync --baseline load.json
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+APP = os.path.join(REPO_DIR, "app.py")
+EVENTS_ROUTE = "/ticker/events"
+
+sys.path.insert(0, BENCH_DIR)
+from replay_server import ReplayServer, parse_source_map, radio_stations, redirect_yahoo  # noqa: E402
+from run_bench import replay_stats, upstream_requests  # noqa: E402
+
+# Metrics where a larger number is worse, compared against --baseline.
+COMPARED = [
+    "first_p50_ms", "first_p95_ms", "first_p99_ms",
+    "rerun_p50_ms", "rerun_p95_ms", "rerun_p99_ms",
+    "cpu_mean_pct", "rss_peak_mb", "rerun_kib",
+]
+
+
+def raise_fd_limit():
+    # Every session holds two sockets on each side.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def serve(replay_url, port):
+    # Child process: the Streamlit server with upstreams on the replay server.
+    raise_fd_limit()
+    redirect_yahoo(replay_url)
+    from streamlit.web import cli
+
+    sys.argv = [
+        "streamlit", "run", APP,
+        "--server.port", str(port),
+        "--server.headless", "true",
+        "--browser.gatherUsageStats", "false",
+    ]
+    sys.exit(cli.main())
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_healthy(base_url, proc, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("streamlit server exited during startup")
+        try:
+            with urllib.request.urlopen(base_url + "/_stcore/health", timeout=2):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("streamlit server did not become healthy")
+
+
+class ProcSampler:
+    # CPU percent and RSS of one process, read from /proc every `period`.
+    def __init__(self, pid, period=0.5):
+        self.pid = pid
+        self.period = period
+        self.cpu = []
+        self.rss = []
+        self._stop = threading.Event()
+        self._ticks = os.sysconf("SC_CLK_TCK")
+        self._page = os.sysconf("SC_PAGE_SIZE")
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+
+    def _read(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{self.pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        return (int(fields[11]) + int(fields[12])) / self._ticks, rss_pages * self._page
+
+    def _run(self):
+        cpu_before, _ = self._read()
+        wall_before = time.monotonic()
+        while not self._stop.wait(self.period):
+            try:
+                cpu, rss = self._read()
+            except OSError:
+                return
+            wall = time.monotonic()
+            self.cpu.append((cpu - cpu_before) / (wall - wall_before) * 100)
+            self.rss.append(rss)
+            cpu_before, wall_before = cpu, wall
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def schedule(sessions, interval, duration, ramp, sync, seed):
+    # Per session: start offset and rerun offsets in seconds from the start.
+    rng = random.Random(seed)
+    plans = []
+    for index in range(sessions):
+        start = ramp * index / sessions
+        offset = 0.0 if sync else rng.uniform(0, interval)
+        reruns = []
+        at = ramp + offset + interval
+        while interval > 0 and at < ramp + duration:
+            reruns.append(at)
+            at += interval
+        plans.append((start, reruns))
+    return plans
+
+
+def rerun_message(cached_hashes):
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    msg.rerun_script.cached_message_hashes.extend(sorted(cached_hashes))
+    return msg.SerializeToString()
+
+
+async def run_script(ws, cached_hashes):
+    # Send one rerun and read until it finishes: (seconds, bytes, exceptions).
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    started = time.perf_counter()
+    await ws.send(rerun_message(cached_hashes))
+    received = exceptions = 0
+    while True:
+        data = await ws.recv()
+        received += len(data)
+        msg = ForwardMsg()
+        msg.ParseFromString(data)
+        if msg.metadata.cacheable:
+            cached_hashes.add(msg.hash)
+        kind = msg.WhichOneof("type")
+        if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+            exceptions += msg.delta.new_element.WhichOneof("type") == "exception"
+        if kind == "script_finished":
+            return time.perf_counter() - started, received, exceptions
+
+
+async def follow_events(host, port, counts):
+    # Keep the ticker's event stream open and count what arrives.
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {EVENTS_ROUTE} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            counts["sse_bytes"] += len(line)
+            counts["sse_events"] += line.startswith(b"event:")
+    finally:
+        writer.close()
+
+
+async def viewer(ws_url, plan, started, results, counts, events_at):
+    import websockets
+
+    start, reruns = plan
+    loop = asyncio.get_running_loop()
+    await asyncio.sleep(max(0.0, started + start - loop.time()))
+    events = asyncio.create_task(follow_events(*events_at, counts)) if events_at else None
+    try:
+        async with websockets.connect(ws_url, subprotocols=["streamlit"], max_size=None, open_timeout=120) as ws:
+            cached_hashes = set()
+            seconds, size, exceptions = await run_script(ws, cached_hashes)
+            results["first"].append(seconds)
+            counts["exceptions"] += exceptions
+            for at in reruns:
+                await asyncio.sleep(max(0.0, started + at - loop.time()))
+                seconds, size, exceptions = await run_script(ws, cached_hashes)
+                results["rerun"].append(seconds)
+                results["rerun_bytes"].append(size)
+                counts["exceptions"] += exceptions
+    except Exception:
+        counts["failed_sessions"] += 1
+    finally:
+        if events is not None:
+            events.cancel()
+
+
+async def drive(host, port, plans, events):
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = {"first": [], "rerun": [], "rerun_bytes": []}
+    counts = {"exceptions": 0, "failed_sessions": 0, "sse_bytes": 0, "sse_events": 0}
+    ws_url = f"ws://{host}:{port}/_stcore/stream"
+    await asyncio.gather(*(
+        viewer(ws_url, plan, started, results, counts, (host, port) if events else None)
+        for plan in plans
+    ))
+    return results, counts
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def summarize(results, counts, sampler, upstream):
+    summary = {}
+    for phase in ("first", "rerun"):
+        for q in (50, 95, 99):
+            summary[f"{phase}_p{q}_ms"] = percentile(results[phase], q) * 1000
+        summary[f"{phase}_count"] = len(results[phase])
+    summary["rerun_kib"] = statistics.mean(results["rerun_bytes"]) / 1024 if results["rerun_bytes"] else 0.0
+    summary["cpu_mean_pct"] = statistics.mean(sampler.cpu) if sampler.cpu else 0.0
+    summary["cpu_max_pct"] = max(sampler.cpu, default=0.0)
+    summary["rss_peak_mb"] = max(sampler.rss, default=0) / 1024 / 1024
+    summary.update(counts)
+    summary["upstream"] = upstream
+    return summary
+
+
+def print_report(summary, baseline=None):
+    print(f"{'metric':16} {'value':>10} {'baseline':>10} {'delta':>8}")
+    for key in COMPARED:
+        line = f"{key:16} {summary[key]:10.1f}"
+        if baseline and key in baseline:
+            before = baseline[key]
+            delta = (summary[key] - before) / before if before else 0.0
+            line += f" {before:10.1f} {delta:+8.1%}"
+        print(line)
+    print(f"runs: {summary['first_count']} first, {summary['rerun_count']} reruns; "
+          f"cpu max {summary['cpu_max_pct']:.0f}%; "
+          f"ticker events {summary['sse_events']} ({summary['sse_bytes'] / 1024:.1f} KiB)")
+    print("upstream requests:", summary["upstream"])
+    if summary["exceptions"] or summary["failed_sessions"]:
+        print(f"script exceptions: {summary['exceptions']}, failed sessions: {summary['failed_sessions']}")
+
+
+def regressions(summary, baseline, threshold):
+    return [
+        key for key in COMPARED
+        if baseline.get(key, 0) > 0 and (summary[key] - baseline[key]) / baseline[key] > threshold
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with simulated viewers.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between a session's reruns (0: none)")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of reruns after the ramp")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which sessions connect")
+    parser.add_argument("--sync", action="store_true", help="rerun every session at the same instant")
+    parser.add_argument("--no-events", action="store_true", help="do not open the ticker event streams")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", default="", help="per-source delay in seconds, e.g. nws=0.2,yahoo=0.5")
+    parser.add_argument("--errors", default="", help="per-source error rate, e.g. reddit=0.3")
+    parser.add_argument("--store", help="DASHBOARD_STORE for the server (default: a fresh SQLite file)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that fails --baseline")
+    parser.add_argument("--serve", nargs=2, metavar=("REPLAY_URL", "PORT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve[0], int(args.serve[1]))
+
+    raise_fd_limit()
+    replay = ReplayServer(latency=parse_source_map(args.latency), errors=parse_source_map(args.errors)).start()
+    host, port = "127.0.0.1", free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            NWS_BASE_URL=replay.base_url,
+            NEWS_FEED_URL=replay.base_url + "/r/space/.rss",
+            RADIO_STATIONS=radio_stations(replay.base_url),
+            SPACE_IMAGES_URL=replay.base_url + "/r/spaceporn/top/.json",
+            SPACE_IMAGES_DIR=os.path.join(tmp, "images"),
+            DASHBOARD_STORE=args.store or os.path.join(tmp, "snapshots.sqlite3"),
+        )
+        log_path = os.path.join(tmp, "server.log")
+        with open(log_path, "w") as log:
+            server = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--serve", replay.base_url, str(port)],
+                env=env, cwd=REPO_DIR, stdout=log, stderr=subprocess.STDOUT,
+            )
+        try:
+            try:
+                wait_healthy(f"http://{host}:{port}", server)
+            except RuntimeError:
+                with open(log_path) as log:
+                    sys.stderr.write(log.read()[-4000:])
+                raise
+            replay_stats(replay.base_url, reset=True)
+            sampler = ProcSampler(server.pid).start()
+            plans = schedule(args.sessions, args.interval, args.duration, args.ramp, args.sync, args.seed)
+            results, counts = asyncio.run(drive(host, port, plans, not args.no_events))
+            sampler.stop()
+            upstream = upstream_requests(replay_stats(replay.base_url))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    replay.stop()
+
+    summary = summarize(results, counts, sampler, upstream)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["summary"]
+    print_report(summary, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "summary": summary}, f, indent=2)
+
+    status = 1 if summary["failed_sessions"] else 0
+    if baseline:
+        slower = regressions(summary, baseline, args.threshold)
+        if slower:
+            print(f"regressions over {args.threshold:.0%}: {', '.join(slower)}")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
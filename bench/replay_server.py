@@ -0,0 +1,333 @@
+# Local stand-in for weather.gov, Yahoo Finance, the Reddit RSS feed, the
+# r/spaceporn listing and its images (/media/<post>[_<width>].jpg), and the
+# radio streams (/radio/<name>).
+#
+# Serves the recorded responses in bench/fixtures/ with optional injected
+# latency and errors per source, and counts every request so benchmark and
+# load-test runs can report upstream traffic. Recorded dates are shifted to
+# today so date-filtered sections (the 8am-8pm hourly strip) render the same
+# way on every run.
+#
+#   python bench/replay_server.py --port 8600 --latency nws=0.2,yahoo=0.5 --errors reddit=0.3
+#
+# GET /__replay__/stats returns the counters as JSON; /__replay__/reset zeroes them.
+
+import argparse
+import datetime as dt
+import functools
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (source, path pattern, fixture, content type, Cache-Control)
+ROUTES = [
+    ("nws", r"^/points/(?P<latitude>[-\d.]+),(?P<longitude>[-\d.]+)$", "nws_points.json", "application/geo+json", "public, max-age=86400"),
+    ("nws", r"^/gridpoints/\w+/\d+,\d+/forecast/hourly$", "nws_forecast_hourly.json", "application/geo+json", "public, max-age=900"),
+    ("nws", r"^/gridpoints/\w+/\d+,\d+/forecast$", "nws_forecast.json", "application/geo+json", "public, max-age=900"),
+    ("reddit", r"^/r/\w+/\.rss$", "reddit_space.rss", "application/atom+xml; charset=UTF-8", "max-age=0, must-revalidate"),
+    ("yahoo", r"^/v8/finance/chart/(?P<symbol>[^/]+)$", "yahoo_chart.json", "application/json;charset=utf-8", "no-cache"),
+    ("reddit", r"^/r/\w+/top/\.json$", None, "application/json; charset=UTF-8", "private, max-age=0"),
+    ("media", r"^/media/(?P<post>\w+?)(?:_(?P<width>\d+))?\.jpg$", None, "image/jpeg", "public, max-age=86400"),
+    ("radio", r"^/radio/\w+$", None, "audio/mpeg", "no-cache"),
+]
+# A replayed radio stream: a short run of filler bytes standing in for audio.
+RADIO_STREAM = "\x00" * 4096
+# The replayed r/spaceporn listing: image posts with Reddit's preview sizes
+# and a large original, plus one link post that is not an image.
+SPACE_POSTS = 8
+PREVIEW_WIDTHS = (108, 216, 320, 640, 960)
+ORIGINAL_SIZE = (4000, 3000)
+
+_ISO_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})T")
+# Degrees per replayed grid cell, about the 2.5 km of the real NWS grid.
+GRID_STEP = 0.025
+ERROR_STATUS = {"reddit": 429}
+
+
+def parse_source_map(text):
+    # "nws=0.2,yahoo=0.5" -> {"nws": 0.2, "yahoo": 0.5}
+    result = {}
+    for item in filter(None, (text or "").split(",")):
+        name, _, value = item.partition("=")
+        result[name.strip()] = float(value)
+    return result
+
+
+def rebase_dates(body, today=None):
+    # Shift every ISO date in the document by the same number of days so
+    # the earliest one falls on today.
+    dates = _ISO_DATE_RE.findall(body)
+    if not dates:
+        return body
+    today = today or dt.date.today()
+    shift = today - dt.date.fromisoformat(min(dates))
+    return _ISO_DATE_RE.sub(
+        lambda m: (dt.date.fromisoformat(m.group(1)) + shift).isoformat() + "T", body
+    )
+
+
+def grid_points(body, latitude, longitude):
+    # The recorded /points answer moved to the grid cell containing the
+    # coordinates, so nearby locations share a cell and distant ones don't.
+    points = json.loads(body)
+    properties = points["properties"]
+    old = f"/{properties['gridX']},{properties['gridY']}/"
+    properties["gridX"] = int((longitude + 180) / GRID_STEP)
+    properties["gridY"] = int((latitude + 90) / GRID_STEP)
+    new = f"/{properties['gridX']},{properties['gridY']}/"
+    for key in ("forecast", "forecastHourly", "forecastGridData"):
+        if key in properties:
+            properties[key] = properties[key].replace(old, new)
+    return json.dumps(points)
+
+
+def yahoo_chart(template, symbol, range_="2d"):
+    # The recorded chart with the symbol swapped in and prices scaled by a
+    # per-symbol factor, so every ticker gets distinct but stable numbers.
+    # range=1d returns only the last recorded bar, like a same-day request.
+    chart = json.loads(template)
+    factor = 0.2 + (zlib.crc32(symbol.encode()) % 1000) / 250
+    result = chart["chart"]["result"][0]
+    result["meta"]["symbol"] = symbol
+    for key in ("regularMarketPrice", "chartPreviousClose", "regularMarketDayHigh", "regularMarketDayLow"):
+        result["meta"][key] = round(result["meta"][key] * factor, 2)
+    for quote in result["indicators"]["quote"]:
+        for key in ("open", "high", "low", "close"):
+            quote[key] = [round(v * factor, 2) for v in quote[key]]
+    adjclose = result["indicators"]["adjclose"][0]
+    adjclose["adjclose"] = [round(v * factor, 2) for v in adjclose["adjclose"]]
+    if range_ == "1d":
+        result["timestamp"] = result["timestamp"][-1:]
+        for series in result["indicators"]["quote"] + result["indicators"]["adjclose"]:
+            for key in series:
+                series[key] = series[key][-1:]
+        result["meta"]["range"] = "1d"
+    return json.dumps(chart)
+
+
+def space_listing(base_url, count=SPACE_POSTS):
+    # Reddit listing JSON; preview URLs are HTML-escaped as Reddit sends them.
+    width, height = ORIGINAL_SIZE
+    children = [{"kind": "t3", "data": {"id": "link", "title": "Discussion", "post_hint": "link", "url": base_url}}]
+    for i in range(count):
+        post = f"post{i}"
+        resolutions = [
+            {"url": f"{base_url}/media/{post}_{w}.jpg?width={w}&amp;format=pjpg", "width": w, "height": w * height // width}
+            for w in PREVIEW_WIDTHS
+        ]
+        children.append({"kind": "t3", "data": {
+            "id": post,
+            "title": f"Replayed nebula {i}",
+            "permalink": f"/r/spaceporn/comments/{post}/",
+            "post_hint": "image",
+            "url": f"{base_url}/media/{post}.jpg",
+            "preview": {"images": [{
+                "source": {"url": f"{base_url}/media/{post}.jpg", "width": width, "height": height},
+                "resolutions": resolutions,
+            }]},
+        }})
+    return json.dumps({"kind": "Listing", "data": {"children": children}})
+
+
+@functools.lru_cache(maxsize=64)
+def space_image(post, width=None):
+    # JPEG bytes of a generated image, `width` wide (the full original size
+    # if None); each post gets its own colours.
+    from PIL import Image
+
+    full_width, full_height = ORIGINAL_SIZE
+    width = width or full_width
+    seed = zlib.crc32(post.encode())
+    image = Image.linear_gradient("L").resize((width, width * full_height // full_width))
+    image = Image.merge("RGB", [image.point(lambda v, k=k: (v * (seed >> (8 * k) & 0xFF)) // 255) for k in range(3)])
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=90)
+    return out.getvalue()
+
+
+def radio_stations(base_url, count=3):
+    # RADIO_STATIONS value pointing the player at replayed streams.
+    return "; ".join(f"Replay {i}|{base_url}/radio/station{i}" for i in range(1, count + 1))
+
+
+def redirect_yahoo(base_url):
+    # yfinance has no endpoint setting, so point the module-level chart URL
+    # it formats requests with at the replay server and skip the cookie/crumb
+    # handshake, which the chart endpoint does not need. Only call this in a
+    # benchmark or load-test process.
+    import yfinance.base
+    import yfinance.scrapers.history
+    from yfinance.data import YfData
+
+    yfinance.base._BASE_URL_ = base_url
+    yfinance.scrapers.history._BASE_URL_ = base_url
+    YfData._get_cookie_and_crumb = lambda self, timeout=30: (None, "basic")
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 makes bursts of concurrent clients wait for a
+    # SYN retransmit, which looks like a second of upstream latency.
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Clients that stop reading early (the streaming feed reader) just
+        # drop the connection; that isn't a server error.
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class ReplayServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=None, errors=None, missing_symbols=(), seed=0, fixture_dir=FIXTURE_DIR):
+        self.latency = dict(latency or {})
+        self.errors = dict(errors or {})
+        self.missing_symbols = set(missing_symbols)
+        self.fixture_dir = fixture_dir
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._fixtures = {}
+        self.reset()
+        self.httpd = _HTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.counts = defaultdict(Counter)
+
+    def stats(self):
+        with self._lock:
+            return {source: dict(counts) for source, counts in self.counts.items()}
+
+    def _fixture(self, name):
+        if name not in self._fixtures:
+            with open(os.path.join(self.fixture_dir, name), encoding="utf-8") as f:
+                self._fixtures[name] = f.read()
+        return self._fixtures[name]
+
+    def _should_fail(self, source):
+        rate = self.errors.get(source, 0)
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    def render(self, path, query=""):
+        # (source, status, body, content type, cache control) for a path.
+        for source, pattern, fixture, content_type, cache_control in ROUTES:
+            match = re.match(pattern, path)
+            if match is None:
+                continue
+            body = self._fixture(fixture) if fixture else RADIO_STREAM
+            if source == "reddit" and fixture is None:
+                body = space_listing(self.base_url)
+            elif source == "media":
+                width = match.group("width")
+                body = space_image(match.group("post"), int(width) if width else None)
+            elif source == "nws":
+                body = rebase_dates(body.replace("https://api.weather.gov", self.base_url))
+                if "latitude" in match.groupdict():
+                    body = grid_points(body, float(match.group("latitude")), float(match.group("longitude")))
+            elif source == "yahoo":
+                symbol = match.group("symbol")
+                if symbol in self.missing_symbols:
+                    error = {"chart": {"result": None, "error": {"code": "Not Found", "description": "No data found, symbol may be delisted"}}}
+                    return source, 404, json.dumps(error), content_type, cache_control
+                range_ = parse_qs(query).get("range", ["2d"])[0]
+                body = yahoo_chart(body, symbol, range_)
+            return source, 200, body, content_type, cache_control
+        return None, 404, "not found", "text/plain", "no-cache"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                if path.startswith("/__replay__/"):
+                    if path == "/__replay__/reset":
+                        server.reset()
+                    return self._send(200, json.dumps(server.stats()), "application/json", "no-store")
+
+                source, status, body, content_type, cache_control = server.render(path, query)
+                if source is not None:
+                    time.sleep(server.latency.get(source, 0))
+                    if server._should_fail(source):
+                        status, body = ERROR_STATUS.get(source, 503), "injected error"
+                payload = body if isinstance(body, bytes) else body.encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(payload).hexdigest()[:16]
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    status, payload = 304, b""
+
+                with server._lock:
+                    counts = server.counts[source or "unknown"]
+                    counts["requests"] += 1
+                    counts["bytes"] += len(payload)
+                    counts[f"status_{status}"] += 1
+                self._send(status, payload, content_type, cache_control, etag)
+
+            def _send(self, status, payload, content_type, cache_control, etag=None):
+                if isinstance(payload, str):
+                    payload = payload.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Cache-Control", cache_control)
+                if etag and status in (200, 304):
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if payload:
+                    self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded upstream responses locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--latency", default="", help="per-source delay in seconds, e.g. nws=0.2,yahoo=0.5")
+    parser.add_argument("--errors", default="", help="per-source error rate, e.g. reddit=0.3")
+    parser.add_argument("--missing", default="", help="comma-separated Yahoo symbols to answer with 404")
+    args = parser.parse_args()
+    server = ReplayServer(
+        args.host, args.port,
+        latency=parse_source_map(args.latency),
+        errors=parse_source_map(args.errors),
+        missing_symbols=filter(None, args.missing.split(",")),
+    )
+    print(f"replaying {FIXTURE_DIR} on {server.base_url}")
+    server.httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# Offline benchmark for a full dashboard render.
+#
+# Starts the replay server, then runs each iteration in a fresh Python
+# process so every run starts cold: the dashboard is rendered headless with
+# streamlit.testing's AppTest (a cold run and a warm rerun), and then each
+# data source is called on its own with empty HTTP and feed caches. Reports
+# wall times, per-source times, peak RSS and upstream requests per source.
+# Each run also records the import time of dashboard.py's top-level imports
+# (see import_report.py), which is checked against --import-budget-ms. The
+# JSON output can be passed back as --baseline to compare two commits.
+#
+#   python bench/run_bench.py --runs 5 --json bench.json
+#   python bench/run_bench.py --latency nws=0.3,reddit=0.5 --errors yahoo=0.2
+#   python bench/run_bench.py --baseline bench.json --threshold 0.2
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DASHBOARD = os.path.join(REPO_DIR, "dashboard.py")
+
+sys.path.insert(0, BENCH_DIR)
+import import_report  # noqa: E402
+from replay_server import ReplayServer, parse_source_map, radio_stations, redirect_yahoo  # noqa: E402
+
+# Metrics where a larger number is worse, compared against --baseline.
+COMPARED = [
+    "imports_ms", "render_cold_s", "render_warm_s",
+    "weather_s", "stocks_s", "headlines_s", "radio_s", "space_image_s",
+    "max_rss_mb",
+]
+
+
+def replay_stats(replay_url, reset=False):
+    path = "/__replay__/reset" if reset else "/__replay__/stats"
+    with urllib.request.urlopen(replay_url + path, timeout=5) as response:
+        return json.load(response)
+
+
+def upstream_requests(stats):
+    return {source: counts.get("requests", 0) for source, counts in stats.items()}
+
+
+def child(replay_url):
+    # One cold iteration; prints a JSON result on the last line of stdout.
+    redirect_yahoo(replay_url)
+    sys.path.insert(0, REPO_DIR)
+    from streamlit.testing.v1 import AppTest
+
+    result = {}
+    replay_stats(replay_url, reset=True)
+    app = AppTest.from_file(DASHBOARD, default_timeout=120)
+    started = time.perf_counter()
+    app.run()
+    result["render_cold_s"] = time.perf_counter() - started
+    started = time.perf_counter()
+    app.run()
+    result["render_warm_s"] = time.perf_counter() - started
+    result["exceptions"] = len(app.exception)
+    result["render_upstream"] = upstream_requests(replay_stats(replay_url))
+
+    # Stop the refresher the render started and let its fetches finish, so
+    # it does not fetch (or share singleflight calls) while sources are timed.
+    import fetcher
+    import streamlit as st
+
+    st.cache_resource.clear()
+    fetcher.wait_idle()
+
+    import sources
+
+    calls = {
+        "weather": sources.get_weather_panel,
+        "stocks": lambda: sources.get_stock_ticker_text(sources.popular_stocks),
+        "headlines": sources.fetch_news_headlines,
+        "radio": lambda: sources.radio.probe_all(sources.radio.STATIONS),
+        "space_image": sources.space_images.refresh,
+    }
+    # The render already filled the thumbnail cache; time the source cold.
+    sources.space_images.cache = sources.space_images.ThumbnailCache(
+        tempfile.mkdtemp(dir=os.path.dirname(sources.space_images.CACHE_DIR))
+    )
+    result["source_upstream"] = {}
+    for name, call in calls.items():
+        sources.nws.http.clear()
+        sources.news_aggregator.clear()
+        sources.space_images.http.clear()
+        replay_stats(replay_url, reset=True)
+        started = time.perf_counter()
+        try:
+            call()
+        except Exception:
+            result.setdefault("source_errors", []).append(name)
+        result[f"{name}_s"] = time.perf_counter() - started
+        result["source_upstream"][name] = upstream_requests(replay_stats(replay_url))
+
+    result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(result))
+
+
+def run_iteration(replay_url, store_path):
+    env = dict(
+        os.environ,
+        NWS_BASE_URL=replay_url,
+        NEWS_FEED_URL=replay_url + "/r/space/.rss",
+        RADIO_STATIONS=radio_stations(replay_url),
+        SPACE_IMAGES_URL=replay_url + "/r/spaceporn/top/.json",
+        SPACE_IMAGES_DIR=os.path.splitext(store_path)[0] + "-images",
+        DASHBOARD_STORE=store_path,
+    )
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", replay_url],
+        env=env, cwd=REPO_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark child failed:\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = import_report.measure()
+    result["imports_ms"] = import_report.total_ms(imports)
+    result["imports"] = imports
+    return result
+
+
+def summarize(runs):
+    summary = {}
+    for key in COMPARED:
+        values = [run[key] for run in runs if key in run]
+        if values:
+            summary[key] = {
+                "median": statistics.median(values),
+                "min": min(values),
+                "max": max(values),
+            }
+    return summary
+
+
+def print_report(summary, runs, baseline=None):
+    import_report.print_report(runs[-1]["imports"], top=10)
+    print()
+    print(f"{'metric':16} {'median':>10} {'min':>10} {'max':>10} {'baseline':>10} {'delta':>8}")
+    for key, stats in summary.items():
+        line = f"{key:16} {stats['median']:10.3f} {stats['min']:10.3f} {stats['max']:10.3f}"
+        if baseline and key in baseline:
+            before = baseline[key]["median"]
+            delta = (stats["median"] - before) / before if before else 0.0
+            line += f" {before:10.3f} {delta:+8.1%}"
+        print(line)
+    print("upstream requests per render:", runs[-1]["render_upstream"])
+    print("upstream requests per source call:", runs[-1]["source_upstream"])
+    errors = sum(run["exceptions"] for run in runs)
+    if errors:
+        print(f"script exceptions: {errors}")
+
+
+def regressions(summary, baseline, threshold):
+    # Time and memory metrics whose median grew by more than `threshold`.
+    return [
+        key for key, stats in summary.items()
+        if key in baseline and baseline[key]["median"] > 0
+        and (stats["median"] - baseline[key]["median"]) / baseline[key]["median"] > threshold
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a full dashboard render against replayed upstreams.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", default="", help="per-source delay in seconds, e.g. nws=0.2,yahoo=0.5")
+    parser.add_argument("--errors", default="", help="per-source error rate, e.g. reddit=0.3")
+    parser.add_argument("--store", choices=["cold", "warm"], default="cold",
+                        help="start each run with an empty snapshot store or the previous run's")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that fails --baseline")
+    parser.add_argument("--import-budget-ms", type=float, default=import_report.BUDGET_MS,
+                        help="fail when the median import time of dashboard.py's imports is over this")
+    parser.add_argument("--child", metavar="REPLAY_URL", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child)
+
+    server = ReplayServer(latency=parse_source_map(args.latency), errors=parse_source_map(args.errors)).start()
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.runs):
+            store = os.path.join(tmp, "snapshots.sqlite3" if args.store == "warm" else f"run{i}.sqlite3")
+            runs.append(run_iteration(server.base_url, store))
+    server.stop()
+
+    summary = summarize(runs)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["summary"]
+    print_report(summary, runs, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "summary": summary, "runs": runs}, f, indent=2)
+
+    status = 0
+    if summary["imports_ms"]["median"] > args.import_budget_ms:
+        print(f"imports over budget: {summary['imports_ms']['median']:.1f} ms > {args.import_budget_ms:.0f} ms")
+        status = 1
+    if baseline:
+        slower = regressions(summary, baseline, args.threshold)
+        if slower:
+            print(f"regressions over {args.threshold:.0%}: {', '.join(slower)}")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# Stand-in server for the live ticker component.
+#
+# Serves the ticker widget on its own page together with the real /assets/
+# and /ticker/events routes, and publishes synthetic updates into live.hub:
+# a random walk for a few symbols every --interval seconds and a rotated
+# headline list every tenth tick. No Streamlit server, refresher or upstream
+# is involved, so the component's in-place patching can be checked in a
+# browser (or with curl -N .../ticker/events) on its own.
+#
+#   python bench/ticker_standin.py --port 8601 --interval 1
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import assets  # noqa: E402
+import live  # noqa: E402
+
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA"]
+HEADLINES = [f"Synthetic headline {i}" for i in range(1, 16)]
+HOURLY = "8 AM: 63°F ☀️ | 12 PM: 71°F ☁️ | 4 PM: 71°F 🌬️ | 8 PM: 63°F 🌧️"
+
+
+def publish_ticks(interval, seed=0):
+    import pandas as pd
+
+    import quotes
+
+    rng = random.Random(seed)
+    prev_close = {symbol: rng.uniform(50, 500) for symbol in SYMBOLS}
+    price = dict(prev_close)
+    live.hub.publish("weather", [{"name": "Claremont", "current": "", "hourly": HOURLY}])
+    tick = 0
+    while True:
+        # Move a couple of symbols per tick so most updates are partial.
+        for symbol in rng.sample(SYMBOLS, 2):
+            price[symbol] *= 1 + rng.gauss(0, 0.002)
+        table = pd.DataFrame({"price": price, "prev_close": prev_close})
+        table["pct_change"] = (table["price"] - table["prev_close"]) / table["prev_close"] * 100
+        table["status"] = "ok"
+        live.hub.publish("stocks", quotes.render_quote_spans(table))
+        if tick % 10 == 0:
+            start = tick // 10 % len(HEADLINES)
+            live.hub.publish("headlines", (HEADLINES[start:] + HEADLINES[:start])[:10])
+        tick += 1
+        time.sleep(interval)
+
+
+def app():
+    from starlette.applications import Starlette
+    from starlette.responses import HTMLResponse
+    from starlette.routing import Route
+
+    async def page(request):
+        return HTMLResponse(
+            "<!doctype html><meta charset='utf-8'><title>ticker stand-in</title>"
+            "<body style='margin:0; background:#4facfe'>" + assets.bundle.widget_html("ticker")
+        )
+
+    return Starlette(routes=[Route("/", page)] + assets.routes() + live.routes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the live ticker with synthetic updates.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8601)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between quote ticks")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    threading.Thread(target=publish_ticks, args=(args.interval,), name="ticks", daemon=True).start()
+    print(f"ticker stand-in on http://{args.host}:{args.port}/")
+    uvicorn.run(app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
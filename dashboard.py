@@ -1,44 +1,41 @@
+import html
+
 import streamlit as st
-import requests
-import feedparser
-import random
-from datetime import datetime, time
-import pytz
-from streamlit_autorefresh import st_autorefresh
-import yfinance as yf
+import streamlit.components.v1 as components
+import assets
+import live
+import metrics
+import radio
+import refresher
+import sections
+import singleflight
+import snapshot_store
+import space_images
 
 # === PAGE CONFIG: MUST BE FIRST COMMAND ===
 st.set_page_config(page_title="Claremont Dashboard", layout="wide")
 
+# Every section below is built through the session's section tracker
+# (sections.py): markup is memoized by a hash of its inputs, and sections whose
+# hash did not change since this session's last run are reported as skipped,
+# as Streamlit sends the browser a reference to its copy instead.
+page_sections = sections.tracker()
+page_sections.begin_run()
+
 # === CSS STYLING ===
-st.markdown(
-    """
+PAGE_CSS = """
     <style>
     body {
         background: linear-gradient(to right, #4facfe, #00f2fe);
         color: white;
     }
-    /* News ticker styling */
-    .ticker-container {
+    /* Live ticker component pinned to the bottom of the page */
+    .st-key-live_ticker {
         position: fixed;
         bottom: 0;
+        left: 0;
         width: 100%;
-        background: rgba(0, 0, 0, 0.6);
-        overflow: hidden;
-        white-space: nowrap;
-        box-sizing: border-box;
-        padding: 10px 0;
         z-index: 1000;
-        font-size: 18px;
-    }
-    .ticker-content {
-        display: inline-block;
-        padding-left: 100%;
-        animation: ticker 45s linear infinite;
-    }
-    @keyframes ticker {
-      0% { transform: translate3d(0, 0, 0); }
-      100% { transform: translate3d(-50%, 0, 0); }
     }
 
     /* Top right image styling */
@@ -51,293 +48,177 @@ st.markdown(
         box-shadow: 0 4px 8px rgba(0,0,0,0.2);
         border-radius: 10px;
     }
+
+    /* ?debug=1 metrics overlay */
+    .debug-overlay {
+        position: fixed;
+        top: 75px;
+        left: 20px;
+        z-index: 10000;
+        background: rgba(0, 0, 0, 0.8);
+        color: #0f0;
+        font: 12px monospace;
+        padding: 8px;
+        border-radius: 6px;
+    }
+    .debug-overlay td, .debug-overlay th {
+        padding: 0 6px;
+        text-align: right;
+    }
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+    """
+st.markdown(page_sections.render("css", (PAGE_CSS,)), unsafe_allow_html=True)
 
 # === AUTO REFRESH ===
-# Refresh every 60 seconds for weather & news ticker
-st_autorefresh(interval=600000, limit=None, key="refresh_every_10min")
-
+# Only the weather header refreshes on a timer, as its own fragment; the
+# bottom ticker is pushed to by the server, and the rest of the page (CSS,
+# radio, widgets) is built once per session and left alone between refreshes.
+WEATHER_REFRESH = "600s"
 
 # === HEADER ===
 st.title("🌤️ Alan's Daily Dashboard")
 st.markdown("Updated every minute • Weather • News Headlines")
 
-# === WEATHER FUNCTIONS ===
-def get_weather_forecast():
-    try:
-        points_url = "https://api.weather.gov/points/34.0961,-117.7198"
-        points_data = requests.get(points_url).json()
-        forecast_url = points_data["properties"]["forecast"]
-        forecast_data = requests.get(forecast_url).json()
-        current_forecast = forecast_data["properties"]["periods"][0]
-        return f"{current_forecast['name']}: {current_forecast['temperature']}°{current_forecast['temperatureUnit']} - {current_forecast['shortForecast']}"
-    except Exception as e:
-        return f"Error getting weather: {e}"
-
-def get_hourly_forecast():
-    try:
-        points_url = "https://api.weather.gov/points/34.0961,-117.7198"
-        points_data = requests.get(points_url).json()
-        hourly_url = points_data["properties"]["forecastHourly"]
-        hourly_data = requests.get(hourly_url).json()
-        periods = hourly_data["properties"]["periods"]
-
-        tz = pytz.timezone("America/Los_Angeles")
-        today = datetime.now(tz).date()
-
-        def get_emoji(forecast):
-            forecast = forecast.lower()
-            if "sunny" in forecast or "clear" in forecast:
-                return "☀️"
-            elif "cloud" in forecast:
-                return "☁️"
-            elif "rain" in forecast or "showers" in forecast:
-                return "🌧️"
-            elif "storm" in forecast or "thunder" in forecast:
-                return "⛈️"
-            elif "snow" in forecast:
-                return "❄️"
-            elif "wind" in forecast or "breezy" in forecast:
-                return "🌬️"
-            else:
-                return "🌡️"
-
-        hourly_strings = []
-        for period in periods:
-            start_time_utc = datetime.fromisoformat(period["startTime"].replace("Z", "+00:00"))
-            start_time_local = start_time_utc.astimezone(tz)
-            if start_time_local.date() == today and time(8, 0) <= start_time_local.time() <= time(20, 0):
-                hour_str = start_time_local.strftime("%-I %p")
-                temp = period["temperature"]
-                unit = period["temperatureUnit"]
-                short_forecast = period["shortForecast"]
-                emoji = get_emoji(short_forecast)
-                hourly_strings.append(f"{hour_str}: {temp}°{unit} {emoji}")
-
-        return " | ".join(hourly_strings)
-
-    except Exception as e:
-        return f"Error getting hourly forecast: {e}"
-
-# === STOCKS FUNCTION ===
-def get_stock_ticker_text(symbols):
-    stock_texts = []
-    for symbol in symbols:
-        try:
-            stock = yf.Ticker(symbol)
-            data = stock.history(period="2d")
-            if data.empty or len(data) < 2:
-                continue
-            latest = data.iloc[-1]
-            prev = data.iloc[-2]
-            price = latest['Close']
-            prev_close = prev['Close']
-            pct_change = (price - prev_close) / prev_close * 100
-
-            if pct_change > 0:
-                emoji = "🔺"
-                color = "lightgreen"
-            elif pct_change < 0:
-                emoji = "🔻"
-                color = "#ff7f7f"
-            else:
-                emoji = "⏺️"
-                color = "white"
-
-            pct_change_str = f"{pct_change:+.2f}%"
-            stock_html = f'<span style="color: {color}; margin-right: 20px;">{symbol}: ${price:.2f} {emoji} {pct_change_str}</span>'
-            stock_texts.append(stock_html)
-
-        except Exception:
-            stock_texts.append(f'<span style="color: white; margin-right: 20px;">{symbol}: Error</span>')
-
-    return " ".join(stock_texts)
-
-# === NEWS TICKER FUNCTION ===
-def fetch_news_headlines():
-    feed_url = "https://www.reddit.com/r/space/.rss"
-    headers = {'User-Agent': 'Mozilla/5.0 (compatible; MyApp/1.0)'}
-    response = requests.get(feed_url, headers=headers)
-    feed = feedparser.parse(response.content)
-    headlines = [entry.title for entry in feed.entries if "imgur.com" not in entry.link][:10]
-    return headlines
-
 # === DISPLAY WEATHER, STOCKS, NEWS ===
-weather = get_weather_forecast()
-st.subheader("☁️ Current Weather")
-st.write(weather)
-
-hourly_forecast = get_hourly_forecast()
-
-popular_stocks = [
-    "AAPL", "MSFT", "GOOGL", "AMZN", "TSLA",
-    "NVDA", "META", "BRK-B", "JPM", "V",
-    "UNH", "HD", "PG", "MA", "DIS"
-]
-
-stock_ticker = get_stock_ticker_text(popular_stocks)
-headlines = fetch_news_headlines()
-
-if headlines:
-    colors = ["#FF6347", "#4CAF50", "#2196F3", "#FFD700"]
-    colored_headlines = []
-    for i, hl in enumerate(headlines):
-        color = colors[i % len(colors)]
-        colored_headlines.append(f'<span style="color:{color}; margin-right: 30px;">{hl}</span>')
-
-    ticker_text = ''.join(colored_headlines)
-    ticker_text += ticker_text  # duplicate for smooth ticker
-
-    ticker_text = (
-        f"<b>Hourly Weather:</b> {hourly_forecast} | "
-        f"<b>Stocks:</b> {stock_ticker} | "
-        + ticker_text
+# One refresher per server process polls every source on its own schedule;
+# sessions only read the latest published snapshot. It starts from the values
+# the previous process left in the snapshot store; replicas pointed at one
+# shared store (DASHBOARD_STORE) fetch each source only once between them.
+# `sources` is imported here, after the header is on screen, so its clients
+# and parsers (and their dependencies) load behind the first paint instead of
+# in front of it. Clearing the resource stops the refresher.
+@st.cache_resource(on_release=refresher.Refresher.stop)
+def start_refresher():
+    import sources
+
+    return (
+        refresher.Refresher(sources.SCHEDULE, store=snapshot_store.open_store())
+        .add_listener(live.hub.publish)
+        .start()
     )
 
-    ticker_html = f"""
-    <div class="ticker-container">
-      <div class="ticker-content">
-        {ticker_text}
-      </div>
-    </div>
-    """
-
-    st.markdown(ticker_html, unsafe_allow_html=True)
-else:
-    st.write("No headlines found.")
+data_refresher = start_refresher()
+
+def format_weather(rows):
+    # Markdown for sources.get_weather_panel rows: the forecast on its own for
+    # a single location, otherwise a table. A string is the placeholder.
+    if isinstance(rows, str):
+        return rows
+    if len(rows) == 1:
+        return rows[0]["current"]
+    lines = ["| Location | Forecast |", "| --- | --- |"]
+    lines += [f"| {row['name']} | {row['current']} |" for row in rows]
+    return "\n".join(lines)
+
+@st.fragment(run_every=WEATHER_REFRESH)
+@metrics.span("render.weather_header")
+def weather_header():
+    weather = data_refresher.read(["weather"])["weather"]
+    st.subheader("☁️ Current Weather")
+    st.markdown(sections.tracker().render("weather", (weather,), format_weather))
+
+# The bottom ticker is a component fed over /ticker/events (live.py): the
+# refresher pushes changed quotes, headlines and the hourly forecast straight
+# into it, so it updates in place without a rerun. Its markup never changes,
+# so reruns leave the iframe (and its scroll position) alone.
+@metrics.span("render.ticker")
+def bottom_ticker():
+    with st.container(key="live_ticker"):
+        components.html(page_sections.render("ticker", ("ticker",), assets.bundle.widget_html), height=48)
+
+weather_header()
+bottom_ticker()
+
+# === UPSTREAM REQUEST STATS ===
+# The stats and the debug overlay refresh as fragments, so a wall display
+# that nobody interacts with still shows current numbers.
+STATS_REFRESH = "30s"
+
+@st.fragment(run_every=STATS_REFRESH)
+def upstream_stats():
+    totals = singleflight.totals()
+    st.write(sections.tracker().render(
+        "upstream_totals",
+        (totals["calls"], totals["executions"], totals["shared"]),
+        lambda calls, sent, shared: f"{calls} calls • {sent} sent • {shared} coalesced",
+    ))
+    for key, counts in sorted(singleflight.stats().items()):
+        st.caption(f"{key}: {counts['executions']} sent, {counts.get('shared', 0)} coalesced")
+
+with st.sidebar.expander("Upstream requests"):
+    upstream_stats()
 
 # === NASA / r/spaceporn RANDOM IMAGE TOP RIGHT ===
-#st.title("🪐 Your Daily Space View")
-
-#headers = {"User-agent": "Mozilla/5.0"}
-#url = "https://www.reddit.com/r/spaceporn/top/.json?t=week&limit=50"
-
-#try:
-#    res = requests.get(url, headers=headers, timeout=10)
-#    data = res.json()
-
- #   image_posts = [
- #       post["data"] for post in data["data"]["children"]
- #       if post["data"].get("post_hint") == "image"
- #   ]
-
- #   if image_posts:
-  #      selected_post = random.choice(image_posts)
-  #      img_url = selected_post["url"]
-  #      title = selected_post["title"]
+# The refresher keeps this slot's thumbnail (and the next one) in a local
+# cache served from /images/, so showing it never waits on Reddit. The
+# fragment only picks up a new image when the rotation slot changes.
+SPACE_IMAGE_REFRESH = "600s"
+
+def space_image_html(name, title):
+    return (
+        f'<img src="{html.escape(space_images.image_url(name), quote=True)}" '
+        f'class="top-right-image" title="{html.escape(title, quote=True)}" width="300">'
+    )
 
-   #     st.markdown(f"""
-   #         <img src="{img_url}" class="top-right-image" title="{title}">
-   #     """, unsafe_allow_html=True)
-   # else:
-  #      st.error("No image posts found. Try refreshing the page.")
+@st.fragment(run_every=SPACE_IMAGE_REFRESH)
+@metrics.span("render.space_image")
+def space_image():
+    row = space_images.current(data_refresher.read(["space_image"])["space_image"])
+    if row is not None:
+        st.markdown(
+            sections.tracker().render("space_image", (row["thumb"], row["title"]), space_image_html),
+            unsafe_allow_html=True,
+        )
 
-#except Exception:
-  #  st.error("Error fetching image. Please try again later.")
+space_image()
 
 # === RANDOM RADIO PLAYER ===
 st.title("🎧 Random Radio Player")
 
-radio_stations = [
-    {"name": "NPR News", "url": "https://npr-ice.streamguys1.com/live.mp3"},
-    {"name": "PBS Radio (WNYC)", "url": "https://fm939.wnyc.org/wnycfm"},
-    {"name": "Claremont College Radio (88.7 FM)", "url": "https://streaming.radionomy.com/KSPC"},
-]
-
-selected_station = random.choice(radio_stations)
-
-st.write(f"▶️ Now playing: **{selected_station['name']}**")
-st.audio(selected_station["url"], format="audio/mp3", start_time=0)
+# The station is kept for the session while it stays healthy, so a refresh
+# never restarts the stream. Until the first probe is in, the pick is not
+# kept, and a kept station the refresher has since found dead is replaced.
+RADIO_REFRESH = "300s"
+
+@st.fragment(run_every=RADIO_REFRESH)
+@metrics.span("render.radio")
+def radio_player():
+    health = data_refresher.read(["radio"])["radio"]
+    healthy = {row["url"] for row in radio.healthy_stations(health)}
+    selected_station = st.session_state.get("selected_station")
+    if selected_station is None or selected_station["url"] not in healthy:
+        selected_station = radio.pick(health)
+        if health:
+            st.session_state.selected_station = selected_station
+        else:
+            st.session_state.pop("selected_station", None)
+
+    st.write(sections.tracker().render(
+        "radio", (selected_station["name"],), lambda name: f"▶️ Now playing: **{name}**"
+    ))
+    st.audio(selected_station["url"], format="audio/mp3", start_time=0)
+
+radio_player()
 
 # === CHATGPT LINK WITH ROBOT EMOJI ===
-st.markdown(
-    """
+CHATGPT_LINK = """
     <a href="https://chat.openai.com" target="_blank" style="font-size: 40px; text-decoration:none;">
         🤖
     </a>
-    """,
-    unsafe_allow_html=True
-)
-
-# Date and Time
-
-import streamlit as st
-import streamlit.components.v1 as components
-
-components.html(
     """
-    <link href="https://fonts.googleapis.com/css2?family=VT323&display=swap" rel="stylesheet">
-
-    <style>
-        body {
-            margin: 0;
-            padding: 0;
-        }
-
-        #clock-container {
-            font-family: 'VT323', monospace;
-            font-size: 60px;
-            color: red;
-            background-color: #111;
-            text-align: center;
-            padding: 30px 10px;
-            animation: pulse 2s infinite;
-            letter-spacing: 2px;
-        }
-
-        @keyframes pulse {
-            0% { text-shadow: 0 0 5px red, 0 0 10px red, 0 0 15px red; }
-            50% { text-shadow: 0 0 10px red, 0 0 20px red, 0 0 30px red; }
-            100% { text-shadow: 0 0 5px red, 0 0 10px red, 0 0 15px red; }
-        }
-
-        .colon {
-            animation: blink 1.5s infinite;
-        }
-
-        .ampm {
-            animation: blink 1.5s infinite;
-            
-        }
-
-        @keyframes blink {
-            0%, 49% { opacity: 1; }
-            50%, 100% { opacity: 0; }
-        }
-    </style>
-
-    <div id="clock-container"></div>
-
-    <script>
-        function formatTime(date) {
-            let hours = date.getHours();
-            const minutes = date.getMinutes();
-            const seconds = date.getSeconds();
-            const ampm = hours >= 12 ? 'PM' : 'AM';
-            hours = hours % 12;
-            hours = hours ? hours : 12; // the hour '0' should be '12'
-
-            const dayOptions = { weekday: 'long', month: 'long', day: 'numeric', year: 'numeric' };
-            const dayString = date.toLocaleDateString('en-US', dayOptions);
-
-            return `${dayString} <br> ${hours}<span class="colon">:</span>${String(minutes).padStart(2, '0')}<span class="colon">:</span>${String(seconds).padStart(2, '0')} <span class="ampm">${ampm}</span>`;
-        }
-
-        function updateClock() {
-            const now = new Date();
-            document.getElementById('clock-container').innerHTML = formatTime(now);
-        }
-
-        setInterval(updateClock, 1000);
-        updateClock();
-    </script>
-    """,
-    height=300,
-    scrolling=False,
-)
+st.markdown(page_sections.render("chatgpt", (CHATGPT_LINK,)), unsafe_allow_html=True)
+
+# === WIDGETS ===
+# Clock, T-rex, rocket, Pomodoro and Nostalgia TV share one component (the
+# widget host, see assets.py): one document, one bundle and one scheduler
+# that stops their timers and animations while they are out of view.
+
+with metrics.span("render.widgets"):
+    components.html(
+        page_sections.render("widgets", (assets.WIDGETS,), assets.bundle.host_html),
+        height=assets.HOST_HEIGHT,
+        scrolling=False,
+    )
 
 
 
@@ -377,364 +258,30 @@ components.html(
 
 #st.markdown(video_html, unsafe_allow_html=True)
 
-#trex thing
-
-import streamlit as st
-import streamlit.components.v1 as components
-
-components.html(
-    f"""
-    <div id="overlay"></div>
-    <div id="dino" onclick="triggerDinoEffect()" style="font-size: 50px; cursor: pointer; text-align: center;">🦖</div>
-    
-    <audio id="roar" src="http://soundbible.com/grab.php?id=1319&type=mp3"></audio>
-    <audio id="stomp" src="http://soundbible.com/grab.php?id=164&type=mp3"></audio>
-    
-    <style>
-        #overlay {{
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100vw;
-            height: 100vh;
-            background: rgba(0, 0, 0, 0.6);
-            z-index: 999;
-            display: none;
-        }}
-        .shake {{
-            animation: shake 0.5s;
-            animation-iteration-count: 3;
-        }}
-        @keyframes shake {{
-            0% {{ transform: translate(0px, 0px); }}
-            25% {{ transform: translate(5px, -5px); }}
-            50% {{ transform: translate(-5px, 5px); }}
-            75% {{ transform: translate(5px, 5px); }}
-            100% {{ transform: translate(0px, 0px); }}
-        }}
-    </style>
-
-    <script>
-        function triggerDinoEffect() {{
-            const roar = document.getElementById("roar");
-            const stomp = document.getElementById("stomp");
-            const overlay = document.getElementById("overlay");
-
-            overlay.style.display = "block";
-            document.body.classList.add("shake");
-
-            roar.play();
-
-            setTimeout(() => {{
-                stomp.play();
-            }}, 1000);
-
-            setTimeout(() => {{
-                stomp.play();
-            }}, 1800);
-
-            setTimeout(() => {{
-                document.body.classList.remove("shake");
-                overlay.style.display = "none";
-            }}, 2500);
-        }}
-    </script>
-    """,
-    height=200,
-    scrolling=False,
-)
-
-# Rocket Launch
-
-import streamlit as st
-import streamlit.components.v1 as components
-
-components.html(
-    """
-    <div id="overlay"></div>
-    <div id="rocketContainer">
-        <div id="rocket">🚀</div>
-    </div>
-
-    <audio id="launchSound" src="http://soundbible.com/grab.php?id=1492&type=mp3"></audio>
-
-    <style>
-    #overlay {
-        position: fixed;
-        top: 0; left: 0;
-        width: 100vw; height: 100vh;
-        background-color: rgba(0, 0, 0, 0.5);
-        display: none;
-        z-index: 10;
-    }
-
-    #rocketContainer {
-        position: relative;
-        height: 300px;
-        margin-top: 20px;
-        z-index: 20;
-        text-align: center;
-    }
-
-    #rocket {
-        font-size: 50px;
-        cursor: pointer;
-        transition: transform 5s ease-in;
-        position: relative;
-        z-index: 30;
-    }
-
-    .launch {
-        transform: translateY(-500px);
-    }
-
-    .smoke {
-        position: absolute;
-        top: 60px;
-        left: 50%;
-        transform: translateX(-50%);
-        width: 20px;
-        height: 20px;
-        background: radial-gradient(circle, white 0%, transparent 70%);
-        border-radius: 50%;
-        opacity: 0.6;
-        animation: puff 1s forwards;
-    }
-
-    @keyframes puff {
-        0% {
-            opacity: 0.6;
-            transform: translate(-50%, 0) scale(1);
-        }
-        100% {
-            opacity: 0;
-            transform: translate(-50%, 30px) scale(2);
-        }
-    }
-    </style>
-
-    <script>
-    const rocket = document.getElementById("rocket");
-    const overlay = document.getElementById("overlay");
-    const sound = document.getElementById("launchSound");
-    const container = document.getElementById("rocketContainer");
-
-    rocket.addEventListener("click", () => {
-        // Dim background
-        overlay.style.display = "block";
-
-        // Add launch class to animate
-        rocket.classList.add("launch");
-
-        // Play sound
-        sound.currentTime = 0;
-        sound.play();
-
-        // Add smoke puffs every 500ms for 2s
-        let puffCount = 0;
-        const puffInterval = setInterval(() => {
-            const puff = document.createElement("div");
-            puff.classList.add("smoke");
-            container.appendChild(puff);
-            setTimeout(() => puff.remove(), 1000);
-            puffCount++;
-            if (puffCount >= 4) clearInterval(puffInterval);
-        }, 500);
-
-        // Reset after 5s
-        setTimeout(() => {
-            rocket.classList.remove("launch");
-            overlay.style.display = "none";
-        }, 5000);
-    });
-    </script>
-    """,
-    height=400,
-)
-
-# Pomodoro Timer
-
-import streamlit.components.v1 as components
-
-components.html(
-    """
-    <div style="text-align: center; font-family: 'VT323', monospace; color: white;">
-        <h2>Pomodoro Timer</h2>
-        <div id="timer" style="
-            font-size: 60px;
-            background-color: #111;
-            border: 4px solid #444;
-            border-radius: 12px;
-            padding: 20px 40px;
-            width: fit-content;
-            margin: 20px auto;
-            color: #00ff00;
-            box-shadow: 0 0 20px #00ff00;
-        ">00:30</div>  <!-- Set your initial time here -->
-        <div>
-            <button onclick="startTimer()" style="padding: 10px 20px; margin: 5px; border-radius: 5px;">Start</button>
-            <button onclick="pauseTimer()" style="padding: 10px 20px; margin: 5px; border-radius: 5px;">Pause</button>
-            <button onclick="resetTimer()" style="padding: 10px 20px; margin: 5px; border-radius: 5px;">Reset</button>
-        </div>
-        <audio id="alarmSound" src="http://soundbible.com/grab.php?id=1630&type=mp3" preload="auto"></audio>
-    </div>
-
-    <script>
-        let originalDuration = 1500; // seconds — adjust this for full session (e.g., 1500 for 25 min)
-        let remaining = originalDuration;
-        let timerInterval = null;
-        let isPaused = false;
-
-        function updateDisplay() {
-            let minutes = Math.floor(remaining / 60);
-            let seconds = remaining % 60;
-
-            let color = "#00ff00";
-            let glow = "0 0 20px";
-
-            if (remaining <= 1200 && remaining > 900) {
-                color = "#00aaff"; // blue
-            } else if (remaining <= 900 && remaining > 600) {
-                color = "#ffd700"; // yellow
-            } else if (remaining <= 600 && remaining > 300) {
-                color = "#a64dff"; // purple
-            } else if (remaining <= 300) {
-                color = "#ff3c3c"; // red
-            }
-
-            const timerElement = document.getElementById("timer");
-            timerElement.textContent =
-                (minutes < 10 ? "0" : "") + minutes + ":" +
-                (seconds < 10 ? "0" : "") + seconds;
-
-            timerElement.style.color = color;
-            timerElement.style.boxShadow = `${glow} ${color}`;
-        }
-
-        function startTimer() {
-            if (timerInterval) return; // prevent multiple intervals
-            isPaused = false;
-            timerInterval = setInterval(() => {
-                if (!isPaused && remaining > 0) {
-                    remaining--;
-                    updateDisplay();
-                } else if (remaining <= 0) {
-                    clearInterval(timerInterval);
-                    timerInterval = null;
-                    document.getElementById("alarmSound").play();
-                    alert("Pomodoro complete! Take a break.");
-                }
-            }, 1000);
-        }
-
-        function pauseTimer() {
-            isPaused = true;
-        }
-
-        function resetTimer() {
-            clearInterval(timerInterval);
-            timerInterval = null;
-            remaining = originalDuration;
-            updateDisplay();
-        }
-
-        updateDisplay();
-    </script>
-    """,
-    height=450,
-)
-
-#Nostalgia TV
-
-import streamlit as st
-import streamlit.components.v1 as components
-
-components.html(
-    """
-    <div style="text-align: center; margin-top: 20px;">
-        <span id="tvBtn" style="font-size: 40px; cursor: pointer;">📺</span>
-    </div>
-
-    <div id="tvOverlay" style="
-        display: none;
-        position: fixed;
-        top: 0; left: 0;
-        width: 100vw; height: 100vh;
-        background-color: rgba(0, 0, 0, 0.85);
-        z-index: 9999;
-        align-items: center;
-        justify-content: center;
-        animation: rollIn 1s ease-in-out;
-    ">
-        <div id="tvContainer" style="
-            width: 640px;
-            max-width: 90vw;
-            background-color: #111;
-            border: 10px solid red;
-            box-shadow: 0 0 30px red;
-        "></div>
-    </div>
-
-    <style>
-        @keyframes rollIn {
-            0% {
-                transform: translateY(-100%) scale(0.7);
-                opacity: 0;
-            }
-            100% {
-                transform: translateY(0) scale(1);
-                opacity: 1;
-            }
-        }
-    </style>
+# === DEBUG OVERLAY ===
+# Add ?debug=1 to the URL to see per-section timings and cache/upstream
+# counters, and how much of this rerun's markup was sent or skipped.
+@st.fragment(run_every=STATS_REFRESH)
+def debug_overlay():
+    sent, skipped, sent_count, skipped_count = sections.tracker().totals()
+    rows = "".join(
+        f"<tr><td>{name}</td><td>{row['count']}</td><td>{row['avg'] * 1000:.1f}</td>"
+        f"<td>{row['upstream_requests']:g}</td><td>{row['upstream_bytes'] / 1024:.1f}</td>"
+        f"<td>{row['errors']:g}</td><td>{row['cache_hits']:g}/{row['cache_misses']:g}</td></tr>"
+        for name, row in metrics.snapshot().items()
+    )
+    st.markdown(
+        f"""
+        <div class="debug-overlay">
+        <div>this rerun: {sent_count} sections sent ({sent / 1024:.1f} KiB),
+        {skipped_count} unchanged ({skipped / 1024:.1f} KiB skipped)</div>
+        <table>
+        <tr><th>span</th><th>runs</th><th>avg ms</th><th>upstream</th><th>KiB</th><th>errors</th><th>hit/miss</th></tr>
+        {rows}
+        </table></div>
+        """,
+        unsafe_allow_html=True,
+    )
 
-    <script>
-        const tvBtn = document.getElementById("tvBtn");
-        const tvOverlay = document.getElementById("tvOverlay");
-        const tvContainer = document.getElementById("tvContainer");
-
-        const videoUrls = [
-            "https://www.youtube.com/embed/8TKqq1mtD5I",
-            "https://www.youtube.com/embed/3PkYr4IX9Qw",
-            "https://www.youtube.com/embed/bJPYF49YtPY",
-            "https://www.youtube.com/embed/kJFB6rH3z2A",
-            #MB S9
-            "https://www.youtube.com/embed/v6RWSfGiDuQ",
-            #MB S8
-            "https://www.youtube.com/embed/1xDvSm6dJUU",
-            "https://www.youtube.com/embed/WfPtRq-PKzw",
-            "https://www.youtube.com/embed/963V7hhEeSs",
-            "https://www.youtube.com/embed/DnPy7cRmits",
-            "https://www.youtube.com/embed/dOHWrJo-Ufk",
-            "https://www.youtube.com/embed/oWWNZ_eciGI",
-            "https://www.youtube.com/embed/yaWFyxhj99U",
-            "https://www.youtube.com/embed/yTJzyskVdDE",
-            "https://www.youtube.com/embed/DFSHBugu34E",
-            "https://www.youtube.com/embed/luaYGrSxgGI",
-            #MB S5
-            "https://www.youtube.com/embed/hP9QUQCd_Jc",
-            "https://www.youtube.com/embed/a7G4qPtiU4E",
-            #MB S4
-            "https://www.youtube.com/embed/E-MHDbqbEz4"
-            
-        ];
-
-        tvBtn.onclick = function() {
-            const randomUrl = videoUrls[Math.floor(Math.random() * videoUrls.length)];
-            const iframe = '<iframe width="100%" height="360" src="' + randomUrl + '?autoplay=1" frameborder="0" allow="autoplay; encrypted-media" allowfullscreen></iframe>';
-            tvContainer.innerHTML = iframe;
-            tvOverlay.style.display = "flex";
-        };
-
-        // Optional: click anywhere outside the video to close
-        tvOverlay.onclick = function(e) {
-            if (e.target === tvOverlay) {
-                tvOverlay.style.display = "none";
-                tvContainer.innerHTML = "";
-            }
-        };
-    </script>
-    """,
-    height=600,
-    scrolling=False,
-)
+if st.query_params.get("debug"):
+    debug_overlay()
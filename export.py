@@ -0,0 +1,227 @@
+# Static export of the dashboard for kiosks and lobby screens.
+#
+# Renders the weather panel, the bottom ticker, the radio player and the
+# widgets into a self-contained directory: index.html plus the hashed widget
+# assets under assets/. Any static file server can then serve it to hundreds
+# of screens without a Streamlit session, websocket or script run per screen;
+# the page reloads itself every --reload seconds to pick up new exports.
+#
+# Data comes from the same refresher and store as the live app, so with a
+# shared store (DASHBOARD_STORE) an export usually costs no upstream request
+# at all. The page records a hash of the values it was built from and is only
+# rewritten when they change. Assets are written before the page, and every
+# file is written to a temporary name and renamed into place, so a server
+# never hands out a half-written page or one that points at a missing asset.
+#
+#   python export.py site/            export once (run it from cron)
+#   python export.py site/ --watch    re-export whenever a source changes
+#   python -m http.server -d site 8080
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import assets
+import live
+import radio
+import refresher
+import sections
+import snapshot_store
+
+ASSET_DIR = "assets"
+TICKER_HEIGHT = 48
+RELOAD = 60
+DEBOUNCE = 1.0
+
+_HASH_RE = re.compile(r'<meta name="dashboard-export" content="([0-9a-f]+)">')
+
+PAGE_CSS = """
+body {
+    margin: 0 0 60px;
+    padding: 24px 40px;
+    background: linear-gradient(to right, #4facfe, #00f2fe);
+    color: white;
+    font-family: "Source Sans Pro", sans-serif;
+}
+table { border-collapse: collapse; }
+td, th { padding: 2px 12px 2px 0; text-align: left; }
+iframe { display: block; width: 100%; border: 0; }
+.ticker { position: fixed; bottom: 0; left: 0; z-index: 1000; }
+.chatgpt { font-size: 40px; text-decoration: none; }
+footer { font-size: 12px; opacity: 0.8; }
+"""
+
+# Picks a station per screen among the healthy ones, like the live app does
+# per session.
+RADIO_SCRIPT = """
+<script>
+const stations = JSON.parse(document.getElementById("stations").textContent);
+const station = stations[Math.floor(Math.random() * stations.length)];
+document.getElementById("station-name").textContent = station.name;
+document.getElementById("station").src = station.url;
+</script>
+"""
+
+
+def _script_json(value):
+    # JSON that is safe inside a <script> element.
+    return json.dumps(value).replace("</", "<\\/")
+
+
+def weather_html(rows):
+    if isinstance(rows, str):
+        return f"<p>{html.escape(rows)}</p>"
+    if len(rows) == 1:
+        return f"<p>{html.escape(rows[0]['current'])}</p>"
+    body = "".join(
+        f"<tr><td>{html.escape(row['name'])}</td><td>{html.escape(row['current'])}</td></tr>"
+        for row in rows
+    )
+    return f"<table><tr><th>Location</th><th>Forecast</th></tr>{body}</table>"
+
+
+def ticker_state(values):
+    # The state the live ticker would show for `values`, worked out by a
+    # private hub with no subscribers.
+    hub = live.Hub()
+    for name in live.TICKER_SOURCES:
+        if name in values:
+            hub.publish(name, values[name])
+    return hub.state()
+
+
+def iframe(markup, height, css_class=""):
+    # The widget host and the ticker stay in iframes as in the live app, so
+    # their styles and scripts cannot clash with the page; srcdoc frames
+    # resolve assets/ against the page.
+    return (
+        f'<iframe class="{css_class}" height="{height}" scrolling="no" '
+        f'srcdoc="{html.escape(markup, quote=True)}"></iframe>'
+    )
+
+
+def render_page(values, key, updated_at, reload=RELOAD):
+    prefix = f"{ASSET_DIR}/"
+    state = f'<script type="application/json" id="ticker-state">{_script_json(ticker_state(values))}</script>'
+    stations = [{"name": row["name"], "url": row["url"]} for row in radio.healthy_stations(values.get("radio"))]
+    widgets = iframe(assets.bundle.host_html(assets.WIDGETS, prefix), assets.HOST_HEIGHT)
+    return f"""<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta http-equiv="refresh" content="{reload}">
+<meta name="dashboard-export" content="{key}">
+<title>Claremont Dashboard</title>
+<style>{PAGE_CSS}</style>
+</head>
+<body>
+<h1>🌤️ Alan's Daily Dashboard</h1>
+<p>Updated every minute • Weather • News Headlines</p>
+<h3>☁️ Current Weather</h3>
+{weather_html(values.get("weather", ""))}
+<h1>🎧 Random Radio Player</h1>
+<p>▶️ Now playing: <b id="station-name">{html.escape(stations[0]["name"])}</b></p>
+<audio id="station" controls src="{html.escape(stations[0]["url"], quote=True)}"></audio>
+<script type="application/json" id="stations">{_script_json(stations)}</script>
+{RADIO_SCRIPT}
+<p><a class="chatgpt" href="https://chat.openai.com" target="_blank">🤖</a></p>
+{widgets}
+<footer>Data as of {updated_at:%Y-%m-%d %H:%M}</footer>
+{iframe(assets.bundle.widget_html("ticker", prefix, extra=state), TICKER_HEIGHT, "ticker")}
+</body>
+</html>
+"""
+
+
+def write_atomic(path, content):
+    # Write to a temporary file in the same directory and rename it over
+    # `path`, which replaces it in one step.
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def exported_key(out_dir):
+    # Input hash of the page currently in `out_dir`, if any.
+    try:
+        with open(os.path.join(out_dir, "index.html"), encoding="utf-8") as f:
+            match = _HASH_RE.search(f.read(4096))
+    except FileNotFoundError:
+        return None
+    return match.group(1) if match else None
+
+
+def export(values, out_dir, updated_at, reload=RELOAD, force=False):
+    # Writes the page for `values` unless the one in `out_dir` was built from
+    # the same values and assets. Returns whether anything was written.
+    # Probe latencies change on every probe; only the set of healthy
+    # stations ends up on the page.
+    stations = radio.healthy_stations(values.get("radio"))
+    values = dict(values, radio=[{"name": row["name"], "url": row["url"], "healthy": True} for row in stations])
+    key = sections.input_hash((values, sorted(assets.bundle.names.items()), assets.WIDGETS, reload))
+    if not force and exported_key(out_dir) == key:
+        return False
+    asset_dir = os.path.join(out_dir, ASSET_DIR)
+    os.makedirs(asset_dir, exist_ok=True)
+    for name, (content, _) in assets.bundle.files.items():
+        if not os.path.exists(os.path.join(asset_dir, name)):
+            write_atomic(os.path.join(asset_dir, name), content)
+    page = render_page(values, key, updated_at, reload)
+    write_atomic(os.path.join(out_dir, "index.html"), page.encode("utf-8"))
+    # Assets of earlier builds are only removed once no page refers to them.
+    for name in os.listdir(asset_dir):
+        if name not in assets.bundle.files:
+            os.unlink(os.path.join(asset_dir, name))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the dashboard as a static page.")
+    parser.add_argument("out", help="directory to write index.html and assets/ to")
+    parser.add_argument("--watch", action="store_true", help="keep running and re-export when a source changes")
+    parser.add_argument("--reload", type=int, default=RELOAD, help="seconds between page reloads on the screens")
+    parser.add_argument("--force", action="store_true", help="write the page even if its data is unchanged")
+    args = parser.parse_args()
+
+    import sources
+
+    changed = threading.Event()
+    data = refresher.Refresher(sources.SCHEDULE, store=snapshot_store.open_store())
+    data.add_listener(lambda name, value: changed.set())
+    data.start()
+    os.makedirs(args.out, exist_ok=True)
+    force = args.force
+    while True:
+        changed.clear()
+        values = data.read()
+        stamps = data.latest().fetched_at.values()
+        updated_at = datetime.fromtimestamp(max(stamps, default=time.time()))
+        wrote = export(values, args.out, updated_at, args.reload, force)
+        force = False
+        print(f"{datetime.now():%H:%M:%S} {'exported' if wrote else 'unchanged'} {args.out}", flush=True)
+        if not args.watch:
+            return 0
+        # Sources due at the same time publish within moments of each
+        # other; wait for the batch before rendering again.
+        changed.wait()
+        time.sleep(DEBOUNCE)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
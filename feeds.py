@@ -0,0 +1,294 @@
+# Streaming headline reader for RSS and Atom feeds.
+#
+# The feed is requested with the validators of the last response, so an
+# unchanged feed costs a 304 and the previous headlines are reused. A changed
+# feed is streamed through an incremental XML parser that keeps only each
+# item's title and link, drops filtered links as it goes, and closes the
+# connection as soon as it has `limit` headlines, so the rest of the document
+# is never downloaded, parsed or sanitized.
+#
+# Aggregator merges many feeds: every feed is fetched concurrently through its
+# own reader (and so its own cache and timeout), near-duplicate headlines are
+# collapsed by a hash of their normalized title, and the rest are ranked by
+# recency and feed weight. Which entries are dropped is decided by pluggable
+# rules such as exclude_links("imgur.com").
+
+import contextvars
+import hashlib
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import requests
+
+import metrics
+import singleflight
+from http_cache import DEFAULT_TIMEOUT, USER_AGENT, freshness_lifetime
+
+CHUNK_SIZE = 8 * 1024
+ITEM_TAGS = {"item", "entry"}
+DATE_TAGS = ("published", "pubDate", "updated", "date")
+
+# published is a Unix timestamp, or None when the feed doesn't say.
+Headline = namedtuple("Headline", "title link published")
+
+
+def _local(tag):
+    return tag.rpartition("}")[2]
+
+
+def _entry_link(elem):
+    # RSS keeps the link as text; Atom uses <link href> and the alternate
+    # link is the entry's page (same choice as feedparser's entry.link).
+    for child in elem:
+        if _local(child.tag) != "link":
+            continue
+        href = child.get("href")
+        if href is None:
+            return (child.text or "").strip()
+        if child.get("rel", "alternate") == "alternate":
+            return href
+    return ""
+
+
+def _timestamp(text):
+    # Atom dates are ISO 8601, RSS pubDate is RFC 822.
+    text = (text or "").strip()
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_headlines(chunks, limit, keep=None):
+    # Headlines for the first `limit` items that pass `keep(headline)`; stops
+    # reading `chunks` as soon as it has them.
+    parser = XMLPullParser(events=("end",))
+    headlines = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if _local(elem.tag) not in ITEM_TAGS:
+                continue
+            fields = {}
+            for child in elem:
+                tag = _local(child.tag)
+                if tag == "title" or tag in DATE_TAGS:
+                    fields.setdefault(tag, child.text)
+            title = (fields.get("title") or "").strip()
+            published = next((_timestamp(fields[tag]) for tag in DATE_TAGS if tag in fields), None)
+            headline = Headline(title, _entry_link(elem), published)
+            elem.clear()
+            if title and (keep is None or keep(headline)):
+                headlines.append(headline)
+                if len(headlines) >= limit:
+                    return headlines
+    return headlines
+
+
+class FeedReader:
+    def __init__(self, url, limit=10, keep=None, headers=None, timeout=DEFAULT_TIMEOUT):
+        self.url = url
+        self.limit = limit
+        self.keep = keep
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        if headers:
+            self.session.headers.update(headers)
+        self.timeout = timeout
+        self.etag = None
+        self.last_modified = None
+        self.expires_at = 0.0
+        self._headlines = None
+        self._lock = threading.Lock()
+
+    def headlines(self):
+        # [Headline], in feed order.
+        with self._lock:
+            if self._headlines is not None and time.time() < self.expires_at:
+                metrics.count("cache_hits")
+                return self._headlines
+        return singleflight.do(f"GET {self.url}", self._fetch)
+
+    def _fetch(self):
+        request_headers = {}
+        if self._headlines is not None:
+            if self.etag:
+                request_headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                request_headers["If-Modified-Since"] = self.last_modified
+
+        with self.session.get(self.url, headers=request_headers, timeout=self.timeout, stream=True) as response:
+            metrics.count("upstream_requests")
+            lifetime = freshness_lifetime(response.headers)
+            if response.status_code == 304 and self._headlines is not None:
+                metrics.count("cache_hits")
+                with self._lock:
+                    self.expires_at = time.time() + lifetime
+                return self._headlines
+
+            metrics.count("cache_misses")
+            response.raise_for_status()
+            received = 0
+
+            def chunks():
+                nonlocal received
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    received += len(chunk)
+                    yield chunk
+
+            try:
+                headlines = parse_headlines(chunks(), self.limit, self.keep)
+            except ParseError as e:
+                raise ValueError(f"Unreadable feed {self.url}: {e}") from e
+            finally:
+                metrics.count("upstream_bytes", received)
+
+        with self._lock:
+            self._headlines = headlines
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+            self.expires_at = time.time() + lifetime
+        return headlines
+
+    def last(self):
+        # Headlines from the last successful fetch, or None.
+        with self._lock:
+            return self._headlines
+
+    def clear(self):
+        with self._lock:
+            self._headlines = None
+            self.etag = self.last_modified = None
+            self.expires_at = 0.0
+
+
+def exclude_links(*fragments):
+    # Rule that drops entries whose link contains any of `fragments`.
+    def keep(headline):
+        return not any(fragment in headline.link for fragment in fragments)
+    return keep
+
+
+def all_rules(rules):
+    # Combines keep rules into the single predicate FeedReader takes.
+    rules = tuple(rules)
+    if not rules:
+        return None
+    return lambda headline: all(rule(headline) for rule in rules)
+
+
+_STOPWORDS = {"a", "an", "and", "as", "at", "for", "from", "in", "is", "of", "on", "the", "to", "with"}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def title_key(title):
+    # Hash of the title's words, ignoring case, punctuation, word order and
+    # stopwords, so reposts and lightly reworded headlines collide.
+    words = sorted(set(_WORD_RE.findall(title.lower())) - _STOPWORDS)
+    return hashlib.blake2b(" ".join(words).encode(), digest_size=8).digest()
+
+
+class Feed:
+    def __init__(self, url, weight=1.0, timeout=DEFAULT_TIMEOUT):
+        self.url = url
+        self.weight = weight
+        self.timeout = timeout
+
+
+def parse_feeds(text, timeout=DEFAULT_TIMEOUT):
+    # "url url|weight ..." (whitespace or comma separated) -> [Feed]
+    feeds = []
+    for item in re.split(r"[\s,]+", text.strip()):
+        if item:
+            url, _, weight = item.partition("|")
+            feeds.append(Feed(url, float(weight or 1.0), timeout))
+    return feeds
+
+
+class Aggregator:
+    # Feed fetches are I/O bound; enough threads to fetch a few dozen feeds
+    # in one round trip.
+    MAX_WORKERS = 32
+
+    def __init__(self, feeds, limit=10, per_feed=None, rules=(), half_life=6 * 3600, headers=None):
+        # No feed can place more than `limit` headlines in the result, so by
+        # default each reader stops after that many.
+        self.feeds = list(feeds)
+        self.limit = limit
+        self.half_life = half_life
+        keep = all_rules(rules)
+        self.readers = [
+            FeedReader(feed.url, limit=per_feed or limit, keep=keep, headers=headers, timeout=feed.timeout)
+            for feed in self.feeds
+        ]
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(self.MAX_WORKERS, len(self.feeds)) or 1, thread_name_prefix="feed"
+        )
+
+    def _collect(self):
+        # [(feed, [Headline])] for every feed that answered in time, or None
+        # if none did. When at least one feed answered, a feed that failed or
+        # is still running at its timeout contributes the last headlines its
+        # reader fetched, if any.
+        # Each fetch runs in a copy of the caller's context so its counters
+        # land on the caller's metrics span.
+        futures = [
+            (feed, reader, self._executor.submit(contextvars.copy_context().run, reader.headlines))
+            for feed, reader in zip(self.feeds, self.readers)
+        ]
+        wait([future for _, _, future in futures], timeout=max(feed.timeout for feed in self.feeds))
+        collected = []
+        failed = []
+        for feed, reader, future in futures:
+            if future.done() and future.exception() is None:
+                collected.append((feed, future.result()))
+            else:
+                metrics.count("errors")
+                failed.append((feed, reader))
+        if not collected:
+            return None
+        collected += [(feed, reader.last() or []) for feed, reader in failed]
+        return collected
+
+    def score(self, feed, headline, now):
+        # Feed weight, halved for every `half_life` of age. Undated entries
+        # count as one half-life old.
+        age = self.half_life if headline.published is None else max(0.0, now - headline.published)
+        return feed.weight * 0.5 ** (age / self.half_life)
+
+    def headlines(self):
+        if not self.feeds:
+            return []
+        # Fails when no feed answered this round, so the refresher keeps
+        # serving (and ageing) the last headlines instead of re-stamping them.
+        collected = self._collect()
+        if collected is None:
+            raise RuntimeError("no feed answered")
+        if not any(headlines for _, headlines in collected):
+            raise RuntimeError("no feed returned any headlines")
+        now = time.time()
+        best = {}
+        for feed, headlines in collected:
+            for headline in headlines:
+                score = self.score(feed, headline, now)
+                key = title_key(headline.title)
+                if key not in best or score > best[key][0]:
+                    best[key] = (score, headline)
+        ranked = sorted(best.values(), key=lambda item: item[0], reverse=True)
+        return [headline for _, headline in ranked[:self.limit]]
+
+    def clear(self):
+        for reader in self.readers:
+            reader.clear()
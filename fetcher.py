@@ -0,0 +1,59 @@
+# Fetch layer for the dashboard's data sources.
+#
+# submit() starts a source's fetch on a shared thread pool and returns its
+# future; the refresher publishes the result from the future's callback. A
+# source that is still being fetched is not started again: submit() hands
+# back the running future instead of stacking another request behind a slow
+# upstream. _run() times every fetch as a metrics span named after the
+# source, so the upstream counters it records land on that span.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+
+import metrics
+
+MAX_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fetch")
+_lock = threading.Lock()
+_in_flight = {}
+
+
+class Source:
+    def __init__(self, name, fn, deadline, placeholder=None):
+        self.name = name
+        self.fn = fn
+        self.deadline = deadline
+        self.placeholder = placeholder
+
+
+def _finished(name, future):
+    with _lock:
+        if _in_flight.get(name) is future:
+            del _in_flight[name]
+
+
+def _run(source):
+    with metrics.span(source.name):
+        return source.fn()
+
+
+def submit(source):
+    # Reuse a fetch that is still running instead of stacking another one
+    # behind a slow upstream.
+    with _lock:
+        future = _in_flight.get(source.name)
+        if future is not None:
+            return future
+        future = _executor.submit(_run, source)
+        _in_flight[source.name] = future
+    future.add_done_callback(partial(_finished, source.name))
+    return future
+
+
+def wait_idle(timeout=None):
+    # Waits until no fetch is in flight, e.g. after stopping a refresher.
+    with _lock:
+        futures = list(_in_flight.values())
+    wait(futures, timeout=timeout)
@@ -0,0 +1,145 @@
+# Pooled HTTP session with a small conditional-request cache.
+#
+# Responses are kept per URL together with their validators (ETag /
+# Last-Modified) and a freshness deadline taken from Cache-Control / Expires.
+# While a response is fresh it is served without touching the network; once
+# it goes stale the next request is sent with If-None-Match /
+# If-Modified-Since so an unchanged resource only costs a 304. With
+# `max_per_host`, at most that many requests are sent to one host at a time;
+# the rest wait for a slot.
+
+import json
+import re
+import threading
+import time
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+import metrics
+import singleflight
+
+USER_AGENT = "ClaremontDashboard/1.0 (streamlit dashboard)"
+DEFAULT_TIMEOUT = 10
+
+_MAX_AGE_RE = re.compile(r"max-age\s*=\s*(\d+)")
+
+
+class CachedResponse:
+    def __init__(self, url, body, headers, expires_at):
+        self.url = url
+        self.body = body
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+        self.expires_at = expires_at
+        self._json = None
+
+    def is_fresh(self, now=None):
+        return (now or time.time()) < self.expires_at
+
+    def json(self):
+        if self._json is None:
+            self._json = json.loads(self.body)
+        return self._json
+
+
+def _http_date(value):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers):
+    # Seconds the response may be served from cache, per RFC 9111 (simplified).
+    cache_control = headers.get("Cache-Control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    if match:
+        age = headers.get("Age", "0")
+        return max(0, int(match.group(1)) - (int(age) if age.isdigit() else 0))
+    expires = _http_date(headers.get("Expires"))
+    if expires is not None:
+        date = _http_date(headers.get("Date")) or time.time()
+        return max(0, expires - date)
+    return 0
+
+
+class HttpCache:
+    def __init__(self, headers=None, timeout=DEFAULT_TIMEOUT, max_per_host=None):
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        if headers:
+            self.session.headers.update(headers)
+        self.timeout = timeout
+        self.max_per_host = max_per_host
+        self._entries = {}
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, url):
+        if self.max_per_host is None:
+            return nullcontext()
+        host = urlsplit(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        return slot
+
+    def get(self, url, min_ttl=0, headers=None):
+        # Returns a CachedResponse; `min_ttl` keeps the entry fresh for at least
+        # that many seconds even if the server advertises a shorter lifetime.
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is not None and entry.is_fresh():
+            metrics.count("cache_hits")
+            return entry
+
+        # Concurrent callers that find the same stale entry share one request.
+        return singleflight.do(
+            f"GET {url}", lambda: self._fetch(url, entry, min_ttl, headers)
+        )
+
+    def _fetch(self, url, entry, min_ttl, headers):
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+
+        with self._host_slot(url):
+            response = self.session.get(url, headers=request_headers, timeout=self.timeout)
+        metrics.count("upstream_requests")
+        metrics.count("upstream_bytes", len(response.content))
+        now = time.time()
+        lifetime = max(min_ttl, freshness_lifetime(response.headers))
+
+        if response.status_code == 304 and entry is not None:
+            metrics.count("cache_hits")
+            entry.expires_at = now + lifetime
+            if response.headers.get("ETag"):
+                entry.etag = response.headers["ETag"]
+            return entry
+
+        metrics.count("cache_misses")
+        response.raise_for_status()
+        entry = CachedResponse(url, response.content, response.headers, now + lifetime)
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def get_json(self, url, min_ttl=0, headers=None):
+        return self.get(url, min_ttl=min_ttl, headers=headers).json()
+
+    def invalidate(self, url):
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
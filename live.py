@@ -0,0 +1,121 @@
+# Server-sent events for the bottom ticker.
+#
+# The refresher hands every published value to `hub.publish`; the hub keeps
+# the ticker's current state (the first weather location's hourly forecast,
+# one span per stock symbol, headlines) and pushes only what changed to every
+# open /ticker/events stream: the spans of symbols whose quote changed, or the
+# new headline or forecast text. The ticker component (widgets/ticker.*)
+# patches those into the page in place, so its scroll animation never
+# restarts and no Streamlit rerun is needed. A new stream first receives the
+# full state.
+#
+# Publishing happens on refresher threads and streams are served on the
+# server's event loop, so events are handed over with call_soon_threadsafe.
+
+import asyncio
+import json
+import re
+import threading
+
+# Names of the refresher sources the ticker shows.
+TICKER_SOURCES = ("weather", "stocks", "headlines")
+HEARTBEAT = 15.0
+ROUTE = "/ticker/events"
+
+_SPAN_RE = re.compile(r'<span [^>]*data-symbol="([^"]+)"[^>]*>.*?</span>', re.S)
+
+
+def split_quote_spans(html):
+    # {symbol: span} in ticker order, from quotes.render_quote_spans output.
+    return {match.group(1): match.group(0) for match in _SPAN_RE.finditer(html)}
+
+
+def format_event(kind, data):
+    return f"event: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+class Hub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {"hourly": "", "stocks": {}, "stocks_text": "", "headlines": []}
+        self._subscribers = set()  # (loop, queue)
+
+    def state(self):
+        with self._lock:
+            return dict(self._state)
+
+    def publish(self, name, value):
+        # Refresher listener: works out the patch for `name` and sends it.
+        if name not in TICKER_SOURCES:
+            return
+        if name == "weather":
+            # Rows from sources.get_weather_panel; the ticker shows the first.
+            name = "hourly"
+            value = value[0]["hourly"] if isinstance(value, list) and value else "unavailable"
+        with self._lock:
+            state = self._state
+            if name == "stocks":
+                spans = split_quote_spans(value) if isinstance(value, str) else {}
+                if list(spans) == list(state["stocks"]) and spans:
+                    changed = {s: span for s, span in spans.items() if state["stocks"][s] != span}
+                    patch = ("stocks", changed) if changed else None
+                else:
+                    # Different symbols (or a placeholder): redraw the section.
+                    patch = ("state", None)
+                state["stocks"] = spans
+                state["stocks_text"] = "" if spans else str(value)
+            else:
+                value = list(value) if name == "headlines" else str(value)
+                patch = (name, value) if state[name] != value else None
+                state[name] = value
+            if patch is None:
+                return
+            kind, data = patch
+            event = format_event(kind, dict(state) if kind == "state" else data)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:  # the stream's loop has closed
+                with self._lock:
+                    self._subscribers.discard((loop, queue))
+
+    async def stream(self):
+        # Async iterator of SSE chunks for one client, starting with the full
+        # state; a comment line every HEARTBEAT seconds keeps proxies from
+        # closing an idle connection.
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.add(subscriber)
+            first = format_event("state", dict(self._state))
+        try:
+            yield "retry: 5000\n" + first
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+hub = Hub()
+
+
+def routes():
+    from starlette.responses import StreamingResponse
+    from starlette.routing import Route
+
+    async def serve_events(request):
+        return StreamingResponse(
+            hub.stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return [Route(ROUTE, serve_events)]
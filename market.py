@@ -0,0 +1,138 @@
+# NYSE trading calendar.
+#
+# Regular sessions run 9:30-16:00 New York time on weekdays that are not
+# exchange holidays, and end at 13:00 on the usual early-close days. Holidays
+# are computed from the exchange's rules (fixed dates moved to the nearest
+# weekday, nth-weekday holidays and Good Friday), so no yearly table has to be
+# kept up to date. Special one-off closures are not covered.
+#
+# fresh_until() turns the calendar into a quote refresh schedule: often while
+# the market is open, once shortly after the close, and not again until the
+# next session opens.
+
+import calendar
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+OPEN = time(9, 30)
+CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# Seconds between refreshes during a session, and how long after the close
+# the final fetch waits for the closing prices to settle.
+SESSION_INTERVAL = 60
+CLOSE_SETTLE = 5 * 60
+
+
+def _nth_weekday(year, month, weekday, n):
+    # n-th (1-based) weekday of the month; n=-1 is the last one.
+    days = [day for day in calendar.Calendar().itermonthdates(year, month) if day.month == month and day.weekday() == weekday]
+    return days[n - 1] if n > 0 else days[n]
+
+
+def _easter(year):
+    # Anonymous Gregorian algorithm.
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day):
+    # Saturday holidays are observed on Friday, Sunday ones on Monday.
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def holidays(year):
+    # {date: name} of full-day closures in `year`.
+    days = {
+        _nth_weekday(year, 1, calendar.MONDAY, 3): "Martin Luther King Jr. Day",
+        _nth_weekday(year, 2, calendar.MONDAY, 3): "Washington's Birthday",
+        _easter(year) - timedelta(days=2): "Good Friday",
+        _nth_weekday(year, 5, calendar.MONDAY, -1): "Memorial Day",
+        _observed(date(year, 7, 4)): "Independence Day",
+        _nth_weekday(year, 9, calendar.MONDAY, 1): "Labor Day",
+        _nth_weekday(year, 11, calendar.THURSDAY, 4): "Thanksgiving Day",
+        _observed(date(year, 12, 25)): "Christmas Day",
+    }
+    # A Saturday New Year's Day is not moved back into the old year.
+    new_year = _observed(date(year, 1, 1))
+    if new_year.year == year:
+        days[new_year] = "New Year's Day"
+    if year >= 2022:
+        days[_observed(date(year, 6, 19))] = "Juneteenth"
+    return days
+
+
+@lru_cache(maxsize=None)
+def early_closes(year):
+    candidates = (
+        date(year, 7, 3),
+        _nth_weekday(year, 11, calendar.THURSDAY, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    )
+    return {day for day in candidates if day.weekday() < 5 and day not in holidays(year)}
+
+
+def is_trading_day(day):
+    return day.weekday() < 5 and day not in holidays(day.year)
+
+
+def session(day):
+    # (open, close) Unix timestamps of the regular session on `day`, or None.
+    if not is_trading_day(day):
+        return None
+    close = EARLY_CLOSE if day in early_closes(day.year) else CLOSE
+    return (
+        datetime.combine(day, OPEN, EXCHANGE_TZ).timestamp(),
+        datetime.combine(day, close, EXCHANGE_TZ).timestamp(),
+    )
+
+
+def previous_trading_day(day):
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def next_session(ts):
+    # The session that is open at `ts`, or else the next one to open.
+    day = datetime.fromtimestamp(ts, EXCHANGE_TZ).date()
+    while True:
+        bounds = session(day)
+        if bounds is not None and ts < bounds[1]:
+            return bounds
+        day += timedelta(days=1)
+
+
+def is_open(ts):
+    opens, closes = next_session(ts)
+    return opens <= ts < closes
+
+
+def fresh_until(fetched_at, interval=SESSION_INTERVAL, settle=CLOSE_SETTLE):
+    # When quotes fetched at `fetched_at` should be refreshed: `interval`
+    # later during a session (but not past the close), once more `settle`
+    # after the close for the final prices, and otherwise not before the next
+    # session opens.
+    day = datetime.fromtimestamp(fetched_at, EXCHANGE_TZ).date()
+    today = session(day)
+    if today is not None and today[0] <= fetched_at < today[1]:
+        return min(fetched_at + interval, today[1])
+    if today is not None and today[1] <= fetched_at < today[1] + settle:
+        return today[1] + settle
+    return next_session(fetched_at + settle)[0]
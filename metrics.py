@@ -0,0 +1,132 @@
+# Latency spans and counters for the data sources and render blocks.
+#
+# `with metrics.span("weather"):` times a block and makes it the current span
+# for the thread, so lower layers (HttpCache, the feed fetch, the quote batch,
+# snapshot reads) can attribute upstream requests, bytes, errors and cache
+# hits/misses to it with `metrics.count(...)`. Everything is exported in the
+# Prometheus text format on /metrics (mounted by app.py) and summarised in the
+# page's debug overlay (?debug=1).
+
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNTERS = {
+    "upstream_requests": "Requests sent to an upstream API.",
+    "upstream_bytes": "Response bytes received from upstream APIs.",
+    "errors": "Spans that raised, plus failed upstream requests.",
+    "cache_hits": "Values served from a cache without a full upstream fetch.",
+    "cache_misses": "Lookups that needed an upstream fetch or found no value.",
+    "coalesced": "Upstream calls that joined an identical call already in flight.",
+    "stale_hits": "Snapshot reads served a stale value while it was being refreshed.",
+    "breaker_skips": "Scheduled fetches skipped because the source's circuit breaker was open.",
+    "shared_hits": "Values taken from the shared store that another process fetched.",
+    "lease_waits": "Due refreshes left to the process holding the source's lease.",
+    "render_bytes_sent": "Section markup bytes sent to a browser on a rerun.",
+    "render_bytes_skipped": "Unchanged section markup bytes the browser already held.",
+}
+
+_current = contextvars.ContextVar("metrics_span", default=None)
+_lock = threading.Lock()
+_durations = defaultdict(lambda: {"count": 0, "sum": 0.0, "buckets": [0] * len(BUCKETS)})
+_counters = defaultdict(lambda: defaultdict(float))
+
+
+def current_span():
+    return _current.get()
+
+
+def observe(span_name, seconds):
+    with _lock:
+        stats = _durations[span_name]
+        stats["count"] += 1
+        stats["sum"] += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                stats["buckets"][i] += 1
+
+
+def count(counter, value=1, span_name=None):
+    span_name = span_name or _current.get() or "unattributed"
+    with _lock:
+        _counters[counter][span_name] += value
+
+
+@contextmanager
+def span(name):
+    token = _current.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        count("errors", span_name=name)
+        raise
+    finally:
+        observe(name, time.perf_counter() - started)
+        _current.reset(token)
+
+
+def snapshot():
+    # {span: {"count", "sum", "avg", <counter>: value, ...}} for the overlay.
+    with _lock:
+        names = set(_durations) | {name for values in _counters.values() for name in values}
+        result = {}
+        for name in sorted(names):
+            stats = _durations.get(name, {"count": 0, "sum": 0.0})
+            row = {"count": stats["count"], "sum": stats["sum"]}
+            row["avg"] = stats["sum"] / stats["count"] if stats["count"] else 0.0
+            for counter in COUNTERS:
+                row[counter] = _counters[counter].get(name, 0)
+            result[name] = row
+        return result
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(value):
+    # Full precision: integral counters as integers, anything else as the
+    # shortest repr that round-trips.
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_prometheus():
+    lines = [
+        "# HELP dashboard_span_duration_seconds Time spent in a data source or render block.",
+        "# TYPE dashboard_span_duration_seconds histogram",
+    ]
+    with _lock:
+        for name, stats in sorted(_durations.items()):
+            label = _label(name)
+            for bound, hits in zip(BUCKETS, stats["buckets"]):
+                lines.append(f'dashboard_span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {hits}')
+            lines.append(f'dashboard_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'dashboard_span_duration_seconds_sum{{span="{label}"}} {stats["sum"]:.6f}')
+            lines.append(f'dashboard_span_duration_seconds_count{{span="{label}"}} {stats["count"]}')
+        for counter, help_text in COUNTERS.items():
+            lines.append(f"# HELP dashboard_{counter}_total {help_text}")
+            lines.append(f"# TYPE dashboard_{counter}_total counter")
+            for name, value in sorted(_counters[counter].items()):
+                lines.append(f'dashboard_{counter}_total{{span="{_label(name)}"}} {_sample(value)}')
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _durations.clear()
+        _counters.clear()
+
+
+def routes():
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    async def serve_metrics(request):
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    return [Route("/metrics", serve_metrics)]
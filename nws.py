@@ -0,0 +1,123 @@
+# weather.gov client shared by the current and hourly forecast widgets.
+#
+# The /points lookup maps coordinates to a forecast office grid cell and
+# practically never changes, so it is kept for a week regardless of what the
+# API advertises. Forecast documents follow the API's own Cache-Control /
+# Expires headers and are revalidated with conditional requests.
+#
+# forecast_grids() serves a whole list of locations: the points lookups run
+# concurrently, locations that fall into the same grid cell share one
+# forecast and one hourly fetch, and all of those run concurrently too, with
+# at most MAX_PER_HOST requests in flight to the API at once.
+
+import contextvars
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import metrics
+from http_cache import DEFAULT_TIMEOUT, HttpCache
+
+BASE_URL = os.environ.get("NWS_BASE_URL", "https://api.weather.gov")
+POINTS_TTL = 7 * 24 * 60 * 60
+MAX_PER_HOST = 4
+MAX_WORKERS = 16
+
+# NWS asks clients to identify themselves and to request GeoJSON explicitly.
+http = HttpCache(headers={"Accept": "application/geo+json"}, max_per_host=MAX_PER_HOST)
+
+Location = namedtuple("Location", "name latitude longitude")
+# One grid cell's forecasts; `time_zone` is the cell's IANA zone name.
+Grid = namedtuple("Grid", "time_zone forecast hourly")
+
+
+def parse_locations(text):
+    # "Name@lat,lon; Name@lat,lon" -> [Location]. The API takes at most four
+    # decimals, so coordinates are rounded to that.
+    locations = []
+    for item in text.split(";"):
+        if item.strip():
+            name, _, coords = item.rpartition("@")
+            latitude, longitude = (round(float(value), 4) for value in coords.split(","))
+            locations.append(Location(name.strip() or coords.strip(), latitude, longitude))
+    return locations
+
+
+class NWSClient:
+    def __init__(self, latitude, longitude, http_cache=http):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.http = http_cache
+
+    @property
+    def points_url(self):
+        return f"{BASE_URL}/points/{self.latitude},{self.longitude}"
+
+    def points(self):
+        return self.http.get_json(self.points_url, min_ttl=POINTS_TTL)["properties"]
+
+    def forecast(self):
+        return self.http.get_json(self.points()["forecast"])["properties"]["periods"]
+
+    def forecast_hourly(self):
+        return self.http.get_json(self.points()["forecastHourly"])["properties"]["periods"]
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(latitude, longitude):
+    key = (latitude, longitude)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = NWSClient(latitude, longitude)
+        return _clients[key]
+
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="nws")
+
+
+def _gather(fn, items, timeout):
+    # [fn(item) or None if it failed or missed `timeout`], run concurrently.
+    # Each call runs in a copy of the caller's context so its counters land
+    # on the caller's metrics span.
+    futures = [_executor.submit(contextvars.copy_context().run, fn, item) for item in items]
+    wait(futures, timeout=timeout)
+    results = []
+    for future in futures:
+        if future.done() and future.exception() is None:
+            results.append(future.result())
+        else:
+            metrics.count("errors")
+            results.append(None)
+    return results
+
+
+def forecast_grids(locations, timeout=DEFAULT_TIMEOUT):
+    # ({location: cell}, {cell: Grid}) for every location whose grid cell
+    # and forecasts could be fetched; a cell is (office, x, y).
+    points = _gather(lambda location: get_client(location.latitude, location.longitude).points(), locations, timeout)
+    cells = {}
+    urls = {}
+    for location, properties in zip(locations, points):
+        if properties is None:
+            continue
+        cell = (properties["gridId"], properties["gridX"], properties["gridY"])
+        cells[location] = cell
+        urls.setdefault(cell, properties)
+    documents = _gather(
+        http.get_json,
+        [properties[key] for properties in urls.values() for key in ("forecast", "forecastHourly")],
+        timeout,
+    )
+    grids = {}
+    for (cell, properties), forecast, hourly in zip(urls.items(), documents[::2], documents[1::2]):
+        if forecast is not None and hourly is not None:
+            grids[cell] = Grid(
+                properties.get("timeZone", "UTC"),
+                forecast["properties"]["periods"],
+                hourly["properties"]["periods"],
+            )
+    return {location: cell for location, cell in cells.items() if cell in grids}, grids
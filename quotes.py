@@ -0,0 +1,178 @@
+# Batched stock quotes.
+#
+# All symbols are fetched with a single yf.download call and the price,
+# previous close and percent change are worked out column-wise on the
+# resulting Close frame (one column per symbol), so the cost of a rerun no
+# longer grows with one HTTP round trip per symbol.
+#
+# QuoteBook keeps the last two daily closes between fetches. Once it holds the
+# previous session's close, a refresh only asks for today's bar (period="1d")
+# and merges it in, instead of downloading the whole two-day window again.
+# Every in-session refresh also records the latest prices in `series`, the
+# ring buffers the ticker's intraday sparklines are drawn from.
+#
+# yfinance is imported on the first fetch rather than with this module: it
+# is the slowest import in the dashboard and only the refresher needs it.
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import market
+import metrics
+import singleflight
+import timeseries
+
+UP_COLOR = "lightgreen"
+DOWN_COLOR = "#ff7f7f"
+FLAT_COLOR = "white"
+
+series = timeseries.SeriesStore()
+
+
+def fetch_closes(symbols, period="2d"):
+    import yfinance as yf
+
+    symbols = list(symbols)
+    # yf.download is one call here but one chart request per symbol upstream.
+    metrics.count("upstream_requests", len(symbols))
+    data = yf.download(
+        symbols,
+        period=period,
+        group_by="column",
+        progress=False,
+        threads=True,
+        multi_level_index=True,
+    )
+    if data is None or data.empty:
+        return pd.DataFrame(columns=symbols, dtype=float)
+    return data["Close"].reindex(columns=symbols)
+
+
+def compute_quotes(closes, failed=()):
+    # One row per symbol with price, prev_close, pct_change and a status of
+    # "ok", "skip" (fewer than two closes, same as the old per-symbol loop) or
+    # "error" (the batch returned nothing at all for that symbol, or the
+    # symbol is in `failed`).
+    symbols = list(closes.columns)
+    if closes.empty:
+        quotes = pd.DataFrame(
+            {"price": np.nan, "prev_close": np.nan, "pct_change": np.nan}, index=symbols
+        )
+        quotes["status"] = "error"
+        return quotes
+
+    valid = closes.notna()
+    position = valid.cumsum()
+    count = position.iloc[-1]
+    price = closes.where(valid & position.eq(count)).max()
+    prev_close = closes.where(valid & position.eq(count - 1)).max()
+
+    quotes = pd.DataFrame({"price": price, "prev_close": prev_close})
+    quotes["pct_change"] = (price - prev_close) / prev_close * 100
+    quotes["status"] = np.select(
+        [count.to_numpy() == 0, count.to_numpy() < 2], ["error", "skip"], "ok"
+    )
+    quotes.loc[quotes.index.isin(list(failed)), "status"] = "error"
+    return quotes
+
+
+def render_quote_spans(quotes, series=None):
+    # With a SeriesStore, each quote ends with its intraday sparkline.
+    symbols = quotes.index.to_numpy(dtype=str)
+    pct = quotes["pct_change"].to_numpy(dtype=float)
+    emoji = np.select([pct > 0, pct < 0], ["🔺", "🔻"], "⏺️")
+    color = np.select([pct > 0, pct < 0], [UP_COLOR, DOWN_COLOR], FLAT_COLOR)
+    price_str = np.char.mod("%.2f", quotes["price"].to_numpy(dtype=float))
+    pct_str = np.char.mod("%+.2f%%", pct)
+    sparks = np.full(len(symbols), "", dtype=object)
+    if series is not None:
+        lines = series.sparklines(symbols, color)
+        sparks[:] = [lines[symbol] for symbol in symbols]
+
+    ok_spans = (
+        '<span data-symbol="' + symbols.astype(object) + '" style="color: ' + color.astype(object) + '; margin-right: 20px;">'
+        + symbols.astype(object) + ": $" + price_str.astype(object) + " "
+        + emoji.astype(object) + " " + pct_str.astype(object) + sparks + "</span>"
+    )
+    error_spans = (
+        '<span data-symbol="' + symbols.astype(object) + '" style="color: white; margin-right: 20px;">'
+        + symbols.astype(object) + ": Error</span>"
+    )
+
+    status = quotes["status"].to_numpy()
+    spans = np.where(status == "error", error_spans, ok_spans)[status != "skip"]
+    return " ".join(spans)
+
+
+class QuoteBook:
+    def __init__(self, symbols, series=None):
+        self.symbols = list(symbols)
+        self.series = series
+        self.closes = None
+        self._lock = threading.Lock()
+
+    def _has_previous_close(self, now):
+        # True once the newest stored bar is from the last completed session
+        # (or today), so today's bar is all that can be missing.
+        if self.closes is None or len(self.closes.index) < 2:
+            return False
+        newest = pd.Timestamp(self.closes.index[-1]).date()
+        today = pd.Timestamp(now, unit="s", tz=market.EXCHANGE_TZ).date()
+        return newest >= market.previous_trading_day(today)
+
+    def refresh(self, now=None):
+        # (closes, failed): the last two daily closes per symbol, and the
+        # symbols today's bar came back without. Merged with the stored
+        # closes those would only show as having too few closes.
+        now = now or time.time()
+        with self._lock:
+            failed = frozenset()
+            if not self._has_previous_close(now):
+                closes = fetch_closes(self.symbols, period="2d")
+            else:
+                latest = fetch_closes(self.symbols, period="1d")
+                if latest.empty:
+                    return latest, failed
+                missing = latest.iloc[-1].isna()
+                failed = frozenset(missing.index[missing])
+                # Today's bar replaces an earlier copy of itself; keep two days.
+                closes = latest.combine_first(self.closes).tail(2)
+            if not closes.empty:
+                self.closes = closes
+                self._record(closes, failed, now)
+            return closes, failed
+
+    def _record(self, closes, failed, now):
+        # Sparkline samples only come from the session (and the fetch just
+        # after the close), so nights and weekends don't flatten the line.
+        # Symbols without a price in the newest bar get no sample.
+        if self.series is None:
+            return
+        if market.is_open(now) or market.is_open(now - market.CLOSE_SETTLE):
+            prices = closes.iloc[-1].mask(closes.columns.isin(list(failed)))
+            self.series.append(self.symbols, now, prices.to_numpy())
+
+
+_books = {}
+_books_lock = threading.Lock()
+
+
+def get_book(symbols):
+    key = tuple(symbols)
+    with _books_lock:
+        if key not in _books:
+            _books[key] = QuoteBook(key, series)
+        return _books[key]
+
+
+def get_quotes(symbols):
+    symbols = list(symbols)
+    book = get_book(symbols)
+    try:
+        closes, failed = singleflight.do("yfinance " + ",".join(symbols), book.refresh)
+    except Exception:
+        closes, failed = pd.DataFrame(columns=symbols, dtype=float), ()
+    return compute_quotes(closes, failed)
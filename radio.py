@@ -0,0 +1,112 @@
+# Internet radio stations for the random radio player, and their health.
+#
+# probe_all() checks every station concurrently by opening its stream and
+# reading the first chunk with a short timeout; a station is healthy if it
+# answers 200 with audio and sends bytes. It runs as the refresher's "radio"
+# source, so health is cached for the source's freshness TTL, shared through
+# the store, and never probed on a script run. pick() then chooses among the
+# healthy stations, favouring the ones whose first byte arrived soonest.
+#
+# RADIO_STATIONS replaces the built-in list: "Name|url" entries separated by
+# semicolons.
+
+import contextvars
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import metrics
+
+DEFAULT_STATIONS = [
+    {"name": "NPR News", "url": "https://npr-ice.streamguys1.com/live.mp3"},
+    {"name": "PBS Radio (WNYC)", "url": "https://fm939.wnyc.org/wnycfm"},
+    {"name": "Claremont College Radio (88.7 FM)", "url": "https://streaming.radionomy.com/KSPC"},
+]
+PROBE_TIMEOUT = 3.0
+MAX_WORKERS = 16
+# Latency floor for weighting, so one very close station does not take
+# every pick.
+MIN_TTFB = 0.05
+
+_AUDIO_TYPES = ("audio/", "application/ogg", "application/octet-stream")
+
+
+def parse_stations(text):
+    # "Name|url; Name|url" -> [{"name", "url"}]
+    stations = []
+    for item in text.split(";"):
+        if item.strip():
+            name, _, url = item.partition("|")
+            stations.append({"name": name.strip(), "url": url.strip()})
+    return stations
+
+
+STATIONS = parse_stations(os.environ["RADIO_STATIONS"]) if os.environ.get("RADIO_STATIONS") else DEFAULT_STATIONS
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="radio")
+_session = None
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        import requests
+
+        _session = requests.Session()
+        _session.headers["User-Agent"] = "ClaremontDashboard/1.0 (streamlit dashboard)"
+    return _session
+
+
+def probe(station, timeout=PROBE_TIMEOUT):
+    # The station's row with "healthy" and "ttfb" (seconds to the first
+    # chunk of audio, or None).
+    import requests
+
+    started = time.perf_counter()
+    healthy, ttfb = False, None
+    try:
+        with _get_session().get(station["url"], stream=True, timeout=timeout) as response:
+            metrics.count("upstream_requests")
+            content_type = response.headers.get("Content-Type", "").lower()
+            if response.status_code == 200 and content_type.startswith(_AUDIO_TYPES):
+                chunk = next(response.iter_content(1024), b"")
+                healthy = bool(chunk)
+                ttfb = time.perf_counter() - started
+                metrics.count("upstream_bytes", len(chunk))
+    except requests.RequestException:
+        pass
+    if healthy:
+        metrics.observe("radio.ttfb", ttfb)
+    else:
+        metrics.count("errors")
+    return {"name": station["name"], "url": station["url"], "healthy": healthy, "ttfb": ttfb}
+
+
+def probe_all(stations, timeout=PROBE_TIMEOUT):
+    # One row per station, probed concurrently. Fails if no station answered,
+    # so the refresher keeps the last health it had.
+    futures = [_executor.submit(contextvars.copy_context().run, probe, station, timeout) for station in stations]
+    # A read timeout applies per socket read, so allow for connect + read.
+    wait(futures, timeout=2 * timeout + 1)
+    rows = [
+        future.result() if future.done() else dict(station, healthy=False, ttfb=None)
+        for station, future in zip(stations, futures)
+    ]
+    if not any(row["healthy"] for row in rows):
+        raise RuntimeError("no radio station answered")
+    return rows
+
+
+def healthy_stations(health):
+    # The healthy rows of `health` (probe_all output); every station while
+    # there is no health yet or it is a placeholder.
+    rows = [row for row in health or () if isinstance(row, dict) and row.get("healthy")]
+    return rows or [dict(station, ttfb=None) for station in STATIONS]
+
+
+def pick(health, rng=random):
+    # A healthy station, weighted by 1/ttfb.
+    rows = healthy_stations(health)
+    weights = [1 / max(row["ttfb"] or 1.0, MIN_TTFB) for row in rows]
+    return rng.choices(rows, weights)[0]
@@ -0,0 +1,236 @@
+# Process-wide background refresher.
+#
+# A single daemon thread polls each source on its own interval (through the
+# fetcher pool, so sources still run concurrently) and publishes an immutable
+# Snapshot whenever a fetch succeeds. Script runs only read the latest
+# snapshot, so render cost and upstream traffic no longer depend on how many
+# sessions are open. With a store attached, the previous run's values
+# are published before the first fetch and every new value is persisted.
+#
+# Each source has a resilience.Policy: a value is refetched once it stops
+# being fresh and keeps being served while stale; a failing source is retried
+# with backoff behind its circuit breaker, and readers keep the last good
+# value until it expires.
+#
+# When several server processes share one store (snapshot_store.py), a due
+# source is first looked up there: a value another process fetched that is
+# still fresh is published as is. Otherwise the refresher takes the source's
+# lease before fetching; a process that finds the lease taken rechecks the
+# store every `follow_poll` seconds until the holder's value arrives. So each
+# source is fetched by one process at a time, however many replicas run.
+
+import math
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from types import MappingProxyType
+
+import fetcher
+import metrics
+import resilience
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    values: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+    fetched_at: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+    version: int = 0
+
+
+class Refresher:
+    def __init__(self, schedule, store=None, lease_ttl=60.0, follow_poll=2.0):
+        # schedule: list of (fetcher.Source, resilience.Policy)
+        self.schedule = list(schedule)
+        self.store = store
+        self.lease_ttl = lease_ttl
+        self.follow_poll = follow_poll
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.breakers = {source.name: resilience.CircuitBreaker(policy) for source, policy in self.schedule}
+        self._snapshot = Snapshot()
+        self._listeners = []
+        self._attempted = set()
+        self._next_due = {source.name: 0.0 for source, _ in self.schedule}
+        self._changed = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._restore()
+            self._thread = threading.Thread(target=self._run, name="refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def _restore(self):
+        # Serve stored values right away and only refetch them once they
+        # stop being fresh.
+        if self.store is None:
+            return
+        now = time.time()
+        for source, policy in self.schedule:
+            stored = self._load(source.name)
+            if stored is not None:
+                value, fetched_at = stored
+                self.publish(source.name, value, fetched_at, persist=False)
+                self._next_due[source.name] = time.monotonic() + max(
+                    0.0, policy.fresh_until(fetched_at) - now
+                )
+
+    def add_listener(self, listener):
+        # listener(name, value) is called on the publishing thread after every
+        # new value, including the ones restored from the store.
+        self._listeners.append(listener)
+        return self
+
+    def stop(self):
+        # Returns once the loop has exited, so nothing is submitted after
+        # this; fetches already running finish on the fetcher's pool.
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def latest(self):
+        return self._snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            now = time.monotonic()
+            for source, policy in self.schedule:
+                if now < self._next_due[source.name]:
+                    continue
+                if not self._claim(source.name, policy):
+                    continue
+                breaker = self.breakers[source.name]
+                if not breaker.allow(now):
+                    metrics.count("breaker_skips", span_name=source.name)
+                    self._next_due[source.name] = breaker.retry_at
+                    self._release(source.name)
+                    continue
+                # Moved to the backoff delay by _publish if the fetch fails.
+                wall = time.time()
+                self._next_due[source.name] = now + max(0.0, policy.fresh_until(wall) - wall)
+                future = fetcher.submit(source)
+                future.add_done_callback(partial(self._publish, source.name))
+            self._wake.wait(max(0.0, min(self._next_due.values()) - time.monotonic()))
+
+    def _load(self, name):
+        try:
+            return self.store.load(name)
+        except Exception:
+            metrics.count("errors", span_name=f"store.{name}")
+            return None
+
+    def _claim(self, name, policy):
+        # Whether this process should fetch `name` now. Takes a newer value
+        # from the shared store first; if it is still fresh, or another
+        # process holds the lease, moves _next_due and returns False. If the
+        # store is unreachable, every process fetches for itself.
+        if self.store is None:
+            return True
+        stored = self._load(name)
+        if stored is not None and stored[1] > self._snapshot.fetched_at.get(name, -math.inf):
+            metrics.count("shared_hits", span_name=name)
+            self.publish(name, stored[0], stored[1], persist=False)
+        wall = time.time()
+        if stored is not None and policy.fresh_until(stored[1]) > wall:
+            self._next_due[name] = time.monotonic() + policy.fresh_until(stored[1]) - wall
+            return False
+        try:
+            if self.store.acquire(name, self.owner, self.lease_ttl):
+                return True
+        except Exception:
+            metrics.count("errors", span_name=f"store.{name}")
+            return True
+        metrics.count("lease_waits", span_name=name)
+        self._next_due[name] = time.monotonic() + self.follow_poll
+        return False
+
+    def _renew(self, name, ttl):
+        if self.store is None:
+            return
+        try:
+            self.store.acquire(name, self.owner, ttl)
+        except Exception:
+            metrics.count("errors", span_name=f"store.{name}")
+
+    def _release(self, name):
+        if self.store is None:
+            return
+        try:
+            self.store.release(name, self.owner)
+        except Exception:
+            metrics.count("errors", span_name=f"store.{name}")
+
+    def _publish(self, name, future):
+        breaker = self.breakers[name]
+        if future.cancelled() or future.exception() is not None:
+            # The lease is renewed past the backoff, so other processes wait
+            # for this one's retry instead of piling onto a failing upstream.
+            delay = breaker.record_failure()
+            self._next_due[name] = time.monotonic() + delay
+            self._renew(name, delay + self.lease_ttl)
+            self._wake.set()
+            with self._changed:
+                self._attempted.add(name)
+                self._changed.notify_all()
+            return
+        breaker.record_success()
+        self.publish(name, future.result())
+        self._release(name)
+
+    def publish(self, name, value, fetched_at=None, persist=True):
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        with self._changed:
+            current = self._snapshot
+            values = dict(current.values)
+            values[name] = value
+            stamps = dict(current.fetched_at)
+            stamps[name] = fetched_at
+            self._snapshot = Snapshot(
+                MappingProxyType(values), MappingProxyType(stamps), current.version + 1
+            )
+            self._attempted.add(name)
+            self._changed.notify_all()
+        for listener in self._listeners:
+            listener(name, value)
+        if persist and self.store is not None:
+            try:
+                self.store.save(name, value, fetched_at)
+            except Exception:
+                metrics.count("errors", span_name=f"store.{name}")
+
+    def read(self, names=None):
+        # Latest value of every source. Until a source has a value or its
+        # first fetch has failed, a render waits for it up to the source's
+        # deadline; after that a missing or expired value is replaced by its
+        # placeholder. Stale values are still served while they refresh.
+        started = time.monotonic()
+        result = {}
+        for source, policy in self.schedule:
+            if names is not None and source.name not in names:
+                continue
+            remaining = source.deadline - (time.monotonic() - started)
+            with self._changed:
+                self._changed.wait_for(
+                    lambda: source.name in self._attempted, timeout=max(0.0, remaining)
+                )
+                snapshot = self._snapshot
+            span_name = f"snapshot.{source.name}"
+            state = "missing"
+            if source.name in snapshot.values:
+                state = resilience.freshness(policy, snapshot.fetched_at[source.name])
+            if state == "fresh" or state == "stale":
+                metrics.count("cache_hits", span_name=span_name)
+                if state == "stale":
+                    metrics.count("stale_hits", span_name=span_name)
+                result[source.name] = snapshot.values[source.name]
+            else:
+                metrics.count("cache_misses", span_name=span_name)
+                result[source.name] = source.placeholder
+        return result
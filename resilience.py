@@ -0,0 +1,81 @@
+# Freshness policy and circuit breaker for each upstream source.
+#
+# A value is fresh for `fresh_ttl` seconds after it was fetched; the
+# refresher refetches it then, and readers keep being served the old value
+# for up to `stale_ttl` more seconds while that happens (stale-while-
+# revalidate). A failed fetch is retried after `base_backoff`; after
+# `failure_threshold` consecutive failures the breaker opens and the delay
+# doubles with every further failure up to `max_backoff`. No request is sent
+# to that upstream until the delay has passed, and a single trial request
+# then decides whether the breaker closes again.
+#
+# Sources whose freshness follows a calendar rather than a fixed TTL (quotes
+# only change while the market is open) pass `calendar`, a function from the
+# fetch time to the time the value stops being fresh.
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class Policy:
+    fresh_ttl: float
+    stale_ttl: float
+    failure_threshold: int = 3
+    base_backoff: float = 15.0
+    max_backoff: float = 30 * 60.0
+    calendar: Optional[Callable[[float], float]] = None
+
+    def fresh_until(self, fetched_at):
+        if self.calendar is not None:
+            return self.calendar(fetched_at)
+        return fetched_at + self.fresh_ttl
+
+
+class CircuitBreaker:
+    def __init__(self, policy):
+        self.policy = policy
+        self.failures = 0
+        self.retry_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.failures < self.policy.failure_threshold:
+                return "closed"
+            return "open" if time.monotonic() < self.retry_at else "half-open"
+
+    def allow(self, now=None):
+        with self._lock:
+            return (now or time.monotonic()) >= self.retry_at
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.retry_at = 0.0
+
+    def record_failure(self, now=None):
+        # Returns the delay before the next attempt is allowed.
+        with self._lock:
+            self.failures += 1
+            delay = min(
+                self.policy.max_backoff,
+                self.policy.base_backoff
+                * 2 ** max(0, self.failures - self.policy.failure_threshold),
+            )
+            self.retry_at = (now or time.monotonic()) + delay
+            return delay
+
+
+def freshness(policy, fetched_at, now=None):
+    # "fresh", "stale" (still served) or "expired" (too old to show).
+    now = now or time.time()
+    fresh_until = policy.fresh_until(fetched_at)
+    if now <= fresh_until:
+        return "fresh"
+    if now <= fresh_until + policy.stale_ttl:
+        return "stale"
+    return "expired"
@@ -0,0 +1,89 @@
+# Content-hash bookkeeping for the page's sections.
+#
+# Every section's markup is keyed by a hash of the inputs it is built from.
+# The HTML for a given hash is built once and kept in a small process-wide
+# memo, so a rerun with unchanged inputs reuses it instead of rebuilding it.
+# Streamlit itself hashes each element it sends and, for elements of at
+# least `global.minCachedMessageSize` bytes (lowered in .streamlit/config.toml)
+# that the browser already holds, sends only the hash; the browser reuses
+# the element it has. Each session remembers the hash it last sent per
+# section, which mirrors that rule closely enough to report, per rerun, how
+# many bytes went out and how many were skipped. Totals are also counted
+# per section in metrics (render_bytes_sent / render_bytes_skipped).
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import metrics
+
+MEMO_SIZE = 64
+SESSION_KEY = "_sections"
+
+_memo = OrderedDict()  # (section, input hash) -> html
+_memo_lock = threading.Lock()
+
+
+def input_hash(inputs):
+    digest = hashlib.blake2b(digest_size=16)
+    for value in inputs:
+        data = repr(value).encode()
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _build(name, key, inputs, build):
+    with _memo_lock:
+        html = _memo.get((name, key))
+        if html is not None:
+            _memo.move_to_end((name, key))
+            return html
+    html = build(*inputs) if build is not None else inputs[0]
+    with _memo_lock:
+        _memo[(name, key)] = html
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return html
+
+
+class Tracker:
+    # One per session: the last hash sent for each section and the byte
+    # counts of the current rerun.
+    def __init__(self, min_cached_size):
+        self.min_cached_size = min_cached_size
+        self.hashes = {}
+        self.report = {}
+
+    def begin_run(self):
+        self.report = {}
+
+    def render(self, name, inputs, build=None):
+        # HTML for section `name` built from `inputs` (a tuple); `build(*inputs)`
+        # only runs when nothing is memoized for this input hash. Without
+        # `build` the single input is the HTML.
+        key = input_hash(inputs)
+        html = _build(name, key, inputs, build)
+        size = len(html.encode())
+        skipped = self.hashes.get(name) == key and size >= self.min_cached_size
+        self.hashes[name] = key
+        self.report[name] = (size, skipped)
+        counter = "render_bytes_skipped" if skipped else "render_bytes_sent"
+        metrics.count(counter, size, span_name=f"section.{name}")
+        return html
+
+    def totals(self):
+        # (bytes sent, bytes skipped, sections sent, sections skipped)
+        sent = [size for size, skipped in self.report.values() if not skipped]
+        skipped = [size for size, skipped in self.report.values() if skipped]
+        return sum(sent), sum(skipped), len(sent), len(skipped)
+
+
+def tracker():
+    # The current session's tracker, created on first use.
+    import streamlit as st
+
+    if SESSION_KEY not in st.session_state:
+        min_size = int(st.get_option("global.minCachedMessageSize"))
+        st.session_state[SESSION_KEY] = Tracker(min_size)
+    return st.session_state[SESSION_KEY]
@@ -0,0 +1,72 @@
+# Request coalescing for upstream fetches.
+#
+# Concurrent callers asking for the same key wait on the single call that is
+# already in flight and share its result (or exception) instead of sending a
+# duplicate request. Every call is counted so the saved traffic can be shown.
+
+import threading
+from collections import Counter, defaultdict
+
+import metrics
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Group:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = defaultdict(Counter)
+
+    def do(self, key, fn):
+        with self._lock:
+            stats = self._stats[key]
+            stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                stats["executions"] += 1
+            else:
+                stats["shared"] += 1
+
+        if not leader:
+            metrics.count("coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        # {key: {"calls": n, "executions": n, "shared": n}}
+        with self._lock:
+            return {key: dict(counts) for key, counts in self._stats.items()}
+
+    def totals(self):
+        totals = Counter()
+        with self._lock:
+            for counts in self._stats.values():
+                totals.update(counts)
+        return {name: totals[name] for name in ("calls", "executions", "shared")}
+
+
+group = Group()
+do = group.do
+stats = group.stats
+totals = group.totals
@@ -0,0 +1,208 @@
+# Stores for the last good value of every source.
+#
+# The refresher writes each successful fetch to its store and seeds itself
+# from the store on startup, so a freshly started process can render
+# immediately from the previous run's data while the real fetches happen in
+# the background.
+#
+# A store can also be shared by several server processes (replicas behind a
+# load balancer). Before fetching a source, a refresher checks the store for
+# a value another process fetched recently and uses it if it is still fresh;
+# otherwise it takes the source's lease, and only the lease holder fetches
+# while the others keep reading. Leases expire, so a process that dies while
+# holding one only blocks that source for `ttl` seconds.
+#
+# Three stores share one interface (load, save, acquire, release, close):
+#
+#   MemoryStore     in-process only; nothing is shared or kept across restarts
+#   SnapshotStore   SQLite file, memory-mapped, shared by processes on a host
+#   RedisStore      Redis (or bench/kv_standin.py), shared across hosts;
+#                   needs the redis package
+#
+# open_store() picks one from DASHBOARD_STORE: "memory:", a redis:// URL, or
+# a file path (the default).
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".dashboard", "snapshots.sqlite3")
+MAX_BYTES = 5 * 1024 * 1024
+MAX_AGE = 7 * 24 * 60 * 60
+MMAP_SIZE = 16 * 1024 * 1024
+
+
+class MemoryStore:
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._values = {}  # name -> (value, fetched_at)
+        self._leases = {}  # name -> (owner, expires_at)
+
+    def save(self, name, value, fetched_at=None):
+        with self._lock:
+            self._values[name] = (value, fetched_at or time.time())
+
+    def load(self, name):
+        # (value, fetched_at), or None if there is no entry within max_age.
+        with self._lock:
+            entry = self._values.get(name)
+        if entry is None or entry[1] < time.time() - self.max_age:
+            return None
+        return entry
+
+    def acquire(self, name, owner, ttl):
+        # True if `owner` now holds the lease on `name` for `ttl` seconds,
+        # either newly or by renewing its own.
+        now = time.time()
+        with self._lock:
+            holder, expires_at = self._leases.get(name, (None, 0.0))
+            if holder not in (None, owner) and expires_at > now:
+                return False
+            self._leases[name] = (owner, now + ttl)
+            return True
+
+    def release(self, name, owner):
+        with self._lock:
+            if self._leases.get(name, (None,))[0] == owner:
+                del self._leases[name]
+
+    def close(self):
+        pass
+
+
+class SnapshotStore:
+    # Entries older than `max_age` are dropped, and the oldest entries are
+    # evicted once the payloads add up to more than `max_bytes`. Every process
+    # opens its own connection; WAL lets readers run while one process writes.
+    def __init__(self, path=DEFAULT_PATH, max_bytes=MAX_BYTES, max_age=MAX_AGE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " name TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " size INTEGER NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " name TEXT PRIMARY KEY,"
+                " owner TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+
+    def save(self, name, value, fetched_at=None):
+        payload = json.dumps(value)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots (name, payload, fetched_at, size)"
+                " VALUES (?, ?, ?, ?)",
+                (name, payload, fetched_at or time.time(), len(payload.encode())),
+            )
+            self._evict()
+
+    def load(self, name):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, fetched_at FROM snapshots WHERE name = ? AND fetched_at >= ?",
+                (name, time.time() - self.max_age),
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def acquire(self, name, owner, ttl):
+        # One statement, so two processes racing for an expired lease cannot
+        # both get it.
+        now = time.time()
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at"
+                " WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (name, owner, now + ttl, now),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, name, owner):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def _evict(self):
+        self._db.execute(
+            "DELETE FROM snapshots WHERE fetched_at < ?", (time.time() - self.max_age,)
+        )
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM snapshots").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for name, size in self._db.execute(
+            "SELECT name, size FROM snapshots ORDER BY fetched_at"
+        ).fetchall():
+            self._db.execute("DELETE FROM snapshots WHERE name = ?", (name,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class RedisStore:
+    # Values are JSON under <prefix>value:<name> and expire after max_age;
+    # Redis' own maxmemory policy bounds the size. Leases are keys set with
+    # NX and a PX expiry. Renewing or releasing one is a GET followed by a
+    # write, so in the rare case that a lease expires between the two, two
+    # processes may fetch the same source once; nothing worse happens.
+    def __init__(self, url, prefix="dashboard:", max_age=MAX_AGE, timeout=1.0):
+        import redis
+
+        self.prefix = prefix
+        self.max_age = max_age
+        self._client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    def save(self, name, value, fetched_at=None):
+        payload = json.dumps({"value": value, "fetched_at": fetched_at or time.time()})
+        self._client.set(f"{self.prefix}value:{name}", payload, px=int(self.max_age * 1000))
+
+    def load(self, name):
+        payload = self._client.get(f"{self.prefix}value:{name}")
+        if payload is None:
+            return None
+        entry = json.loads(payload)
+        return entry["value"], entry["fetched_at"]
+
+    def acquire(self, name, owner, ttl):
+        key = f"{self.prefix}lease:{name}"
+        px = max(1, int(ttl * 1000))
+        if self._client.set(key, owner, nx=True, px=px):
+            return True
+        if self._client.get(key) == owner.encode():
+            return bool(self._client.set(key, owner, xx=True, px=px))
+        return False
+
+    def release(self, name, owner):
+        key = f"{self.prefix}lease:{name}"
+        if self._client.get(key) == owner.encode():
+            self._client.delete(key)
+
+    def close(self):
+        self._client.close()
+
+
+def open_store(location=None):
+    location = location or os.environ.get("DASHBOARD_STORE", DEFAULT_PATH)
+    if location == "memory:":
+        return MemoryStore()
+    if location.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(location)
+    return SnapshotStore(location)
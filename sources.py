@@ -0,0 +1,138 @@
+# Data sources behind the dashboard.
+#
+# These functions run on the background refresher's threads, never on a
+# viewer's script run, so they must not call into Streamlit. The heavy
+# libraries (pandas/yfinance via quotes) are imported inside the functions
+# that use them, so they load on those threads after the header has been
+# drawn instead of delaying the first paint.
+
+import os
+from datetime import datetime, time
+from functools import lru_cache, partial
+from zoneinfo import ZoneInfo
+import feeds
+import fetcher
+import market
+import nws
+import radio
+import resilience
+import space_images
+
+# === WEATHER FUNCTIONS ===
+# WEATHER_LOCATIONS lists the panel's locations as "Name@lat,lon", separated
+# by semicolons; the first one also feeds the ticker's hourly strip.
+WEATHER_LOCATIONS = nws.parse_locations(os.environ.get("WEATHER_LOCATIONS", "Claremont@34.0961,-117.7198"))
+
+@lru_cache(maxsize=256)
+def get_emoji(forecast):
+    forecast = forecast.lower()
+    if "sunny" in forecast or "clear" in forecast:
+        return "☀️"
+    elif "cloud" in forecast:
+        return "☁️"
+    elif "rain" in forecast or "showers" in forecast:
+        return "🌧️"
+    elif "storm" in forecast or "thunder" in forecast:
+        return "⛈️"
+    elif "snow" in forecast:
+        return "❄️"
+    elif "wind" in forecast or "breezy" in forecast:
+        return "🌬️"
+    else:
+        return "🌡️"
+
+def get_weather_panel():
+    # One {"name", "current", "hourly"} row per location. Every grid cell is
+    # fetched and formatted once however many locations share it, and the
+    # 8am-8pm strips of all cells are built in a single pass over their
+    # hourly periods, in each cell's own time zone.
+    cells, grids = nws.forecast_grids(WEATHER_LOCATIONS)
+    if not grids:
+        raise RuntimeError("no forecasts returned")
+
+    current = {}
+    days = {}
+    for cell, grid in grids.items():
+        period = grid.forecast[0]
+        current[cell] = f"{period['name']}: {period['temperature']}°{period['temperatureUnit']} - {period['shortForecast']}"
+        tz = ZoneInfo(grid.time_zone)
+        days[cell] = (tz, datetime.now(tz).date())
+
+    strips = {cell: [] for cell in grids}
+    for cell, period in ((cell, period) for cell, grid in grids.items() for period in grid.hourly):
+        tz, today = days[cell]
+        start_time_local = datetime.fromisoformat(period["startTime"].replace("Z", "+00:00")).astimezone(tz)
+        if start_time_local.date() == today and time(8, 0) <= start_time_local.time() <= time(20, 0):
+            hour_str = start_time_local.strftime("%-I %p")
+            emoji = get_emoji(period["shortForecast"])
+            strips[cell].append(f"{hour_str}: {period['temperature']}°{period['temperatureUnit']} {emoji}")
+
+    return [
+        {
+            "name": location.name,
+            "current": current[cells[location]] if location in cells else "Weather unavailable",
+            "hourly": " | ".join(strips[cells[location]]) if location in cells else "unavailable",
+        }
+        for location in WEATHER_LOCATIONS
+    ]
+
+# === STOCKS FUNCTION ===
+def get_stock_ticker_text(symbols):
+    import quotes
+
+    stock_quotes = quotes.get_quotes(symbols)
+    if (stock_quotes["status"] == "error").all():
+        # Nothing came back; fail so the refresher keeps the last good ticker.
+        raise RuntimeError("no quotes returned")
+    return quotes.render_quote_spans(stock_quotes, quotes.series)
+
+# === NEWS TICKER FUNCTION ===
+# NEWS_FEEDS lists the feeds to merge as "url" or "url|weight", separated by
+# spaces or commas; a higher weight ranks a feed's headlines above equally
+# recent ones from other feeds.
+NEWS_FEED_URL = os.environ.get("NEWS_FEED_URL", "https://www.reddit.com/r/space/.rss")
+NEWS_FEEDS = feeds.parse_feeds(os.environ.get("NEWS_FEEDS", NEWS_FEED_URL), timeout=4)
+NEWS_RULES = [feeds.exclude_links("imgur.com")]
+
+news_aggregator = feeds.Aggregator(
+    NEWS_FEEDS,
+    limit=10,
+    rules=NEWS_RULES,
+    headers={'User-Agent': 'Mozilla/5.0 (compatible; MyApp/1.0)'},
+)
+
+def fetch_news_headlines():
+    return [headline.title for headline in news_aggregator.headlines()]
+
+# === SCHEDULE ===
+popular_stocks = [
+    "AAPL", "MSFT", "GOOGL", "AMZN", "TSLA",
+    "NVDA", "META", "BRK-B", "JPM", "V",
+    "UNH", "HD", "PG", "MA", "DIS"
+]
+
+# (source, freshness policy). The deadline is how long a cold render waits
+# for a source's first value before showing the placeholder; the policy says
+# how long a value stays fresh and how long it may be served stale after that
+# while the source is failing.
+WEATHER_POLICY = resilience.Policy(fresh_ttl=600, stale_ttl=6 * 3600)
+# Quotes follow the NYSE calendar: every minute in session, once after the
+# close, then nothing until the next open.
+STOCKS_POLICY = resilience.Policy(fresh_ttl=market.SESSION_INTERVAL, stale_ttl=3600, calendar=market.fresh_until)
+HEADLINES_POLICY = resilience.Policy(fresh_ttl=300, stale_ttl=12 * 3600)
+# Station health is rechecked every five minutes. Renders never wait for a
+# probe: until the first one is done the player picks from every station.
+RADIO_POLICY = resilience.Policy(fresh_ttl=300, stale_ttl=3600)
+# The space image changes with each rotation slot, and the refresh at the
+# start of a slot finds its thumbnail already prefetched by the one before.
+SPACE_IMAGE_POLICY = resilience.Policy(
+    fresh_ttl=space_images.ROTATE, stale_ttl=24 * 3600, calendar=space_images.fresh_until
+)
+
+SCHEDULE = [
+    (fetcher.Source("weather", get_weather_panel, deadline=4, placeholder="Weather unavailable"), WEATHER_POLICY),
+    (fetcher.Source("stocks", partial(get_stock_ticker_text, popular_stocks), deadline=6, placeholder="unavailable"), STOCKS_POLICY),
+    (fetcher.Source("headlines", fetch_news_headlines, deadline=4, placeholder=[]), HEADLINES_POLICY),
+    (fetcher.Source("radio", partial(radio.probe_all, radio.STATIONS), deadline=0, placeholder=[]), RADIO_POLICY),
+    (fetcher.Source("space_image", space_images.refresh, deadline=0, placeholder=[]), SPACE_IMAGE_POLICY),
+]
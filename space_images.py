@@ -0,0 +1,208 @@
+# "Space image of the day" for the top-right slot.
+#
+# refresh() runs as the refresher's "space_image" source: it reads the week's
+# top r/spaceporn image posts and makes sure the thumbnails for the current
+# rotation slot and the next PREFETCH slots are on disk, so the image that
+# comes up next is already there when its slot starts. Thumbnails are built
+# from the smallest Reddit preview that is at least THUMB_WIDTH wide (the
+# original only when there is no preview, and never past MAX_DOWNLOAD bytes),
+# scaled to THUMB_WIDTH once and kept in an LRU disk cache capped at
+# `max_bytes`. The page links the thumbnail from the /images/ route (mounted by
+# app.py), so a viewer loads a few dozen KB from this server and nothing from
+# Reddit.
+#
+# The cache lives under .dashboard/ next to the snapshot store, or in
+# SPACE_IMAGES_DIR. Replicas sharing a store over the network should share
+# that directory too: a replica that adopts another's value cannot show an
+# image whose thumbnail is not in its own cache.
+
+import hashlib
+import html
+import io
+import os
+import threading
+import time
+
+import metrics
+from http_cache import HttpCache
+
+LISTING_URL = os.environ.get("SPACE_IMAGES_URL", "https://www.reddit.com/r/spaceporn/top/.json?t=week&limit=50")
+CACHE_DIR = os.environ.get(
+    "SPACE_IMAGES_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".dashboard", "images"),
+)
+ROUTE_PREFIX = "/images/"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+THUMB_WIDTH = 300
+ROTATE = 60 * 60
+PREFETCH = 1
+MAX_BYTES = 50 * 1024 * 1024
+MAX_DOWNLOAD = 20 * 1024 * 1024
+
+http = HttpCache(headers={"User-Agent": "Mozilla/5.0 (compatible; MyApp/1.0)"})
+
+
+def rotation_slot(now=None):
+    return int((now if now is not None else time.time()) // ROTATE)
+
+
+def fresh_until(fetched_at):
+    # Policy calendar: refresh when the next rotation slot starts.
+    return (rotation_slot(fetched_at) + 1) * ROTATE
+
+
+def _source_url(post):
+    # The smallest preview at least THUMB_WIDTH wide, else the original.
+    # Reddit HTML-escapes the preview URLs in its JSON.
+    try:
+        image = post["preview"]["images"][0]
+    except (KeyError, IndexError):
+        return post["url"]
+    for resolution in sorted(image.get("resolutions", []), key=lambda r: r["width"]):
+        if resolution["width"] >= THUMB_WIDTH:
+            return html.unescape(resolution["url"])
+    return html.unescape(image.get("source", {}).get("url", post["url"]))
+
+
+def candidates(listing):
+    # [{"id", "title", "permalink", "source"}] of the image posts in a listing.
+    posts = [child["data"] for child in listing["data"]["children"]]
+    return [
+        {"id": post["id"], "title": post["title"], "permalink": post.get("permalink", ""), "source": _source_url(post)}
+        for post in posts
+        if post.get("post_hint") == "image"
+    ]
+
+
+def make_thumbnail(data, width=THUMB_WIDTH):
+    # JPEG bytes of `data` scaled down to `width` pixels across.
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        # Lets the JPEG decoder skip straight to a reduced scale.
+        image.draft("RGB", (width, width * image.height // max(image.width, 1)))
+        image = image.convert("RGB")
+        image.thumbnail((width, image.height), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=85, optimize=True, progressive=True)
+        return out.getvalue()
+
+
+class ThumbnailCache:
+    # Thumbnails on disk under names derived from their source URL. Reading
+    # or writing one marks it as used; the least recently used files go once
+    # the directory holds more than `max_bytes`.
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def name(source_url):
+        return hashlib.sha256(source_url.encode()).hexdigest()[:20] + ".jpg"
+
+    def path(self, name):
+        return os.path.join(self.directory, os.path.basename(name))
+
+    def get(self, source_url):
+        # The thumbnail's name, downloading and scaling the source only if it
+        # is not cached yet.
+        name = self.name(source_url)
+        path = self.path(name)
+        if os.path.exists(path):
+            os.utime(path)
+            metrics.count("cache_hits")
+            return name
+        metrics.count("cache_misses")
+        thumbnail = make_thumbnail(self._download(source_url))
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(thumbnail)
+        os.replace(tmp_path, path)
+        self._evict()
+        return name
+
+    def _download(self, url):
+        with http.session.get(url, stream=True, timeout=http.timeout) as response:
+            metrics.count("upstream_requests")
+            response.raise_for_status()
+            chunks, size = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > MAX_DOWNLOAD:
+                    raise ValueError(f"image over {MAX_DOWNLOAD} bytes: {url}")
+                chunks.append(chunk)
+        metrics.count("upstream_bytes", size)
+        return b"".join(chunks)
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(".jpg"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                os.unlink(path)
+                total -= size
+
+
+cache = ThumbnailCache()
+
+
+def refresh(now=None):
+    # Thumbnails for the current slot and the next PREFETCH ones, as
+    # [{"id", "title", "permalink", "thumb"}] with the current image first.
+    # An image that cannot be fetched is skipped in favour of the next post.
+    posts = candidates(http.get_json(LISTING_URL))
+    if not posts:
+        raise RuntimeError("no image posts found")
+    slot = rotation_slot(now)
+    ready = []
+    for offset in range(len(posts)):
+        post = posts[(slot + offset) % len(posts)]
+        try:
+            thumb = cache.get(post["source"])
+        except Exception:
+            metrics.count("errors")
+            continue
+        ready.append({"id": post["id"], "title": post["title"], "permalink": post["permalink"], "thumb": thumb})
+        if len(ready) > PREFETCH:
+            break
+    if not ready:
+        raise RuntimeError("no image could be fetched")
+    return ready
+
+
+def current(rows):
+    # The first row of refresh() output whose thumbnail is in this process's
+    # cache, or None. A value adopted from a shared store may name thumbnails
+    # that only another host's cache holds.
+    for row in rows or ():
+        if isinstance(row, dict) and os.path.exists(cache.path(row["thumb"])):
+            return row
+    return None
+
+
+def image_url(name):
+    import streamlit as st
+
+    base = st.get_option("server.baseUrlPath").strip("/")
+    return f"{'/' + base if base else ''}{ROUTE_PREFIX}{name}"
+
+
+def routes():
+    from starlette.responses import FileResponse, Response
+    from starlette.routing import Route
+
+    async def serve_image(request):
+        path = cache.path(request.path_params["name"])
+        if not os.path.exists(path):
+            return Response("Not found", status_code=404)
+        return FileResponse(path, media_type="image/jpeg", headers={"Cache-Control": CACHE_CONTROL})
+
+    return [Route(ROUTE_PREFIX + "{name}", serve_image)]
@@ -0,0 +1,181 @@
+# Fixed-size in-memory price history for the ticker's sparklines.
+#
+# All series live in one block allocated up front: a row of timestamps and a
+# row of prices per symbol, used as a ring buffer, so a kiosk that runs for
+# weeks never holds more than `max_bytes`. When every row is taken, the symbol
+# that was updated longest ago gives up its row. Appends for a whole quote
+# batch are a handful of vectorized writes, and a sample with the same
+# timestamp as a row's newest one replaces it (a bar that is still forming).
+#
+# Sparklines are downsampled with min/max bucketing: each horizontal pixel
+# keeps the lowest and highest price that fell into it, so spikes survive
+# the reduction. All requested symbols are bucketed and formatted together
+# with array operations; only the final string join is per symbol.
+
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+ROW_BYTES = 8 + 4  # float64 timestamp + float32 price
+SESSION_SPAN = 6.5 * 3600
+
+
+class SeriesStore:
+    def __init__(self, capacity=512, max_bytes=2 * 1024 * 1024):
+        self.capacity = capacity
+        self.max_series = max(1, max_bytes // (capacity * ROW_BYTES))
+        self._times = np.full((self.max_series, capacity), np.nan)
+        self._values = np.full((self.max_series, capacity), np.nan, dtype=np.float32)
+        self._heads = np.zeros(self.max_series, dtype=np.int64)
+        self._updated = np.full(self.max_series, -np.inf)
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return self._times.nbytes + self._values.nbytes
+
+    def _row(self, symbol):
+        row = self._rows.get(symbol)
+        if row is not None:
+            return row
+        if len(self._rows) < self.max_series:
+            row = len(self._rows)
+        else:
+            row = int(np.argmin(self._updated))
+            del self._rows[next(name for name, taken in self._rows.items() if taken == row)]
+            self._heads[row] = 0
+            self._times[row] = np.nan
+            self._values[row] = np.nan
+        self._rows[symbol] = row
+        return row
+
+    def append(self, symbols, timestamp, values):
+        # One sample per symbol at `timestamp`; NaN prices are skipped.
+        values = np.asarray(values, dtype=np.float32)
+        keep = ~np.isnan(values)
+        with self._lock:
+            rows = np.fromiter((self._row(s) for s, k in zip(symbols, keep) if k), dtype=np.int64)
+            if not len(rows):
+                return
+            heads = self._heads[rows]
+            newest = (heads - 1) % self.capacity
+            same = (heads > 0) & (self._times[rows, newest] == timestamp)
+            slots = np.where(same, newest, heads % self.capacity)
+            self._times[rows, slots] = timestamp
+            self._values[rows, slots] = values[keep]
+            self._heads[rows] = heads + ~same
+            self._updated[rows] = timestamp
+
+    def _ordered(self, rows):
+        # (times, values) of `rows` as 2-D arrays in time order; slots that
+        # were never written are NaN.
+        heads = self._heads[rows]
+        start = np.where(heads > self.capacity, heads % self.capacity, 0)
+        order = (start[:, None] + np.arange(self.capacity)) % self.capacity
+        return self._times[rows[:, None], order], self._values[rows[:, None], order]
+
+    def series(self, symbol):
+        # (times, values) in time order, copied out of the ring.
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is None:
+                return np.empty(0), np.empty(0, dtype=np.float32)
+            times, values = self._ordered(np.array([row]))
+        written = ~np.isnan(times[0])
+        return times[0, written], values[0, written]
+
+    def sparklines(self, symbols, colors=None, width=60, height=14, span=SESSION_SPAN):
+        # {symbol: "<svg>...</svg>"} covering the last `span` seconds of each
+        # series; symbols with fewer than two samples get "".
+        symbols = list(symbols)
+        colors = np.asarray(colors if colors is not None else ["white"] * len(symbols), dtype=object)
+        result = dict.fromkeys(symbols, "")
+        with self._lock:
+            known = [i for i, symbol in enumerate(symbols) if symbol in self._rows]
+            if not known:
+                return result
+            rows = np.array([self._rows[symbols[i]] for i in known])
+            times, values = self._ordered(rows)
+        newest = np.nanmax(times, axis=1)
+        with np.errstate(invalid="ignore"):
+            valid = times >= (newest - span)[:, None]
+        svgs = sparkline_svgs(values.astype(np.float64), valid, colors[known], width, height)
+        result.update(zip((symbols[i] for i in known), svgs))
+        return result
+
+
+@lru_cache(maxsize=8)
+def _point_table(width, height):
+    # table[x, y] == "<x * 10>,<y>" for every bucket and y in tenths of a pixel.
+    table = np.empty((width, height * 10 + 1), dtype=object)
+    for x in range(width):
+        for y in range(height * 10 + 1):
+            table[x, y] = f"{x * 10},{y}"
+    return table
+
+
+def sparkline_svgs(values, valid, colors, width=60, height=14):
+    # One SVG per row of `values` (only `valid` entries are plotted). Every
+    # row is cut into `width` buckets by sample rank and each bucket becomes
+    # a vertical stroke from its first extreme to the other, low then high if
+    # the price rose within the bucket. Coordinates are in tenths of a pixel
+    # so they can be formatted as integers.
+    n_rows = len(values)
+    count = valid.sum(axis=1)
+    rank = np.cumsum(valid, axis=1) - 1
+    bucket = rank * width // np.maximum(count, 1)[:, None]
+    row_index, col_index = np.nonzero(valid)
+    flat = row_index * width + bucket[row_index, col_index]
+    points = values[row_index, col_index]
+
+    size = n_rows * width
+    lows = np.full(size, np.inf)
+    highs = np.full(size, -np.inf)
+    first = np.full(size, values.shape[1])
+    last = np.full(size, -1)
+    np.minimum.at(lows, flat, points)
+    np.maximum.at(highs, flat, points)
+    np.minimum.at(first, flat, col_index)
+    np.maximum.at(last, flat, col_index)
+    occupied = (last >= 0).reshape(n_rows, width)
+    row_of = np.repeat(np.arange(n_rows), width)
+    rising = np.zeros(size, dtype=bool)
+    rising[last >= 0] = (
+        values[row_of[last >= 0], last[last >= 0]] >= values[row_of[last >= 0], first[last >= 0]]
+    )
+
+    lows, highs, rising = (a.reshape(n_rows, width) for a in (lows, highs, rising))
+    low = np.where(occupied, lows, np.inf).min(axis=1, keepdims=True)
+    high = np.where(occupied, highs, -np.inf).max(axis=1, keepdims=True)
+    scale = np.where(high > low, (height - 2) * 10 / np.where(high > low, high - low, 1), 0)
+    mid = np.where(high > low, 10, height * 5)
+
+    def to_y(v):
+        return np.rint((high - np.where(occupied, v, high)) * scale + mid).astype(np.int64)
+
+    # Each bucket is two "x,y" points, looked up rather than formatted.
+    table = _point_table(width, height)
+    x = np.arange(width)
+    points = np.stack(
+        [table[x, to_y(np.where(rising, lows, highs))], table[x, to_y(np.where(rising, highs, lows))]], axis=2
+    )
+
+    svgs = []
+    for row in range(n_rows):
+        if count[row] < 2:
+            svgs.append("")
+            continue
+        coords = " ".join(points[row, occupied[row]].ravel().tolist())
+        svgs.append(
+            f'<svg width="{width}" height="{height}" viewBox="0 0 {width * 10} {height * 10}" '
+            f'style="vertical-align: middle; margin: 0 4px;">'
+            f'<polyline points="{coords}" fill="none" stroke="{colors[row]}" stroke-width="10"/></svg>'
+        )
+    return svgs
+
+
+def sparkline_svg(values, color="white", width=60, height=14):
+    values = np.asarray(values, dtype=np.float64)[None, :]
+    return sparkline_svgs(values, ~np.isnan(values), [color], width, height)[0]
@@ -0,0 +1,24 @@
+WidgetHost.define("clock", (root, host) => {
+    const face = root.querySelector(".clock-face");
+
+    function formatTime(date) {
+        let hours = date.getHours();
+        const minutes = date.getMinutes();
+        const seconds = date.getSeconds();
+        const ampm = hours >= 12 ? 'PM' : 'AM';
+        hours = hours % 12;
+        hours = hours ? hours : 12; // the hour '0' should be '12'
+
+        const dayOptions = { weekday: 'long', month: 'long', day: 'numeric', year: 'numeric' };
+        const dayString = date.toLocaleDateString('en-US', dayOptions);
+
+        return `${dayString} <br> ${hours}<span class="colon">:</span>${String(minutes).padStart(2, '0')}<span class="colon">:</span>${String(seconds).padStart(2, '0')} <span class="ampm">${ampm}</span>`;
+    }
+
+    function updateClock(now) {
+        face.innerHTML = formatTime(new Date(now));
+    }
+
+    host.every(1000, updateClock, root);
+    updateClock(Date.now());
+});
@@ -0,0 +1,27 @@
+WidgetHost.define("dino", (root, host) => {
+    const roar = root.querySelector(".roar");
+    const stomp = root.querySelector(".stomp");
+    const overlay = root.querySelector(".overlay");
+
+    function triggerDinoEffect() {
+        overlay.style.display = "block";
+        root.classList.add("shake");
+
+        roar.play();
+
+        host.after(1000, () => {
+            stomp.play();
+        });
+
+        host.after(1800, () => {
+            stomp.play();
+        });
+
+        host.after(2500, () => {
+            root.classList.remove("shake");
+            overlay.style.display = "none";
+        });
+    }
+
+    root.querySelector(".dino").addEventListener("click", triggerDinoEffect);
+});
@@ -0,0 +1,95 @@
+// Runtime for the widget host: mounts every widget listed in the
+// #widget-config JSON into its <section data-widget> and runs their timers.
+//
+// Repeating work goes through one scheduler with a single pending timeout:
+// tasks with the same period fire in the same callback (the clock and a
+// running Pomodoro tick together on the second). Nothing runs while the tab
+// is hidden or for a widget scrolled out of view, and CSS animations stop
+// with it; a widget's due tasks catch up as soon as it is visible again.
+const WidgetHost = (() => {
+    const definitions = {};
+    const tasks = new Set();
+    const offscreen = new Set();
+    let timer = null;
+
+    function define(name, mount) {
+        definitions[name] = mount;
+    }
+
+    function active(task) {
+        return !document.hidden && !offscreen.has(task.root);
+    }
+
+    function nextDue(task, now) {
+        return (Math.floor(now / task.period) + 1) * task.period;
+    }
+
+    function run() {
+        timer = null;
+        const now = Date.now();
+        for (const task of tasks) {
+            if (task.due <= now && active(task)) {
+                task.due = nextDue(task, now);
+                task.fn(now);
+            }
+        }
+        schedule();
+    }
+
+    function schedule() {
+        clearTimeout(timer);
+        timer = null;
+        let due = Infinity;
+        for (const task of tasks) {
+            if (active(task)) due = Math.min(due, task.due);
+        }
+        if (due < Infinity) timer = setTimeout(run, Math.max(0, due - Date.now()));
+    }
+
+    // Calls fn(now) every `period` ms, on multiples of `period`, while
+    // `root` is on screen. Returns a function that stops it.
+    function every(period, fn, root) {
+        const task = {period, fn, root, due: 0};
+        task.due = nextDue(task, Date.now());
+        tasks.add(task);
+        schedule();
+        return () => {
+            tasks.delete(task);
+            schedule();
+        };
+    }
+
+    // One-shot steps of a click effect or an alarm, which must run even
+    // if the widget is hidden meanwhile. Returns a function that cancels it.
+    function after(delay, fn) {
+        const id = setTimeout(fn, delay);
+        return () => clearTimeout(id);
+    }
+
+    function mount(config) {
+        const host = document.querySelector(".widget-host");
+        const observer = new IntersectionObserver((entries) => {
+            for (const entry of entries) {
+                entry.target.classList.toggle("offscreen", !entry.isIntersecting);
+                if (entry.isIntersecting) offscreen.delete(entry.target);
+                else offscreen.add(entry.target);
+            }
+            run();
+        });
+        document.addEventListener("visibilitychange", () => {
+            host.classList.toggle("paused", document.hidden);
+            run();
+        });
+        for (const widget of config.widgets) {
+            const root = host.querySelector(`[data-widget="${widget.name}"]`);
+            observer.observe(root);
+            definitions[widget.name](root, {every, after}, widget.options || {});
+        }
+    }
+
+    return {define, mount};
+})();
+
+document.addEventListener("DOMContentLoaded", () => {
+    WidgetHost.mount(JSON.parse(document.getElementById("widget-config").textContent));
+});
@@ -0,0 +1,83 @@
+WidgetHost.define("pomodoro", (root, host, options) => {
+    const originalDuration = options.duration || 1500; // seconds, set from Python
+    const timerElement = root.querySelector(".timer");
+    // The countdown runs off the wall clock, so it stays right while the
+    // display ticks are paused; the alarm is a one-shot that always fires.
+    let remaining = originalDuration * 1000;
+    let endsAt = null;
+    let stopTicks = null;
+    let cancelAlarm = null;
+
+    function secondsLeft(now) {
+        return Math.max(0, Math.ceil((endsAt === null ? remaining : endsAt - now) / 1000));
+    }
+
+    function updateDisplay(now) {
+        const left = secondsLeft(now);
+        let minutes = Math.floor(left / 60);
+        let seconds = left % 60;
+
+        let color = "#00ff00";
+        let glow = "0 0 20px";
+
+        if (left <= 1200 && left > 900) {
+            color = "#00aaff"; // blue
+        } else if (left <= 900 && left > 600) {
+            color = "#ffd700"; // yellow
+        } else if (left <= 600 && left > 300) {
+            color = "#a64dff"; // purple
+        } else if (left <= 300) {
+            color = "#ff3c3c"; // red
+        }
+
+        timerElement.textContent =
+            (minutes < 10 ? "0" : "") + minutes + ":" +
+            (seconds < 10 ? "0" : "") + seconds;
+
+        timerElement.style.color = color;
+        timerElement.style.boxShadow = `${glow} ${color}`;
+    }
+
+    function stop() {
+        if (stopTicks) stopTicks();
+        if (cancelAlarm) cancelAlarm();
+        stopTicks = cancelAlarm = null;
+    }
+
+    function startTimer() {
+        if (endsAt !== null || remaining <= 0) return; // already running
+        // Ending on a whole second keeps the display ticks on the clock's.
+        endsAt = Math.ceil((Date.now() + remaining) / 1000) * 1000;
+        stopTicks = host.every(1000, updateDisplay, root);
+        cancelAlarm = host.after(endsAt - Date.now(), () => {
+            stop();
+            endsAt = null;
+            remaining = 0;
+            updateDisplay(Date.now());
+            root.querySelector(".alarm-sound").play();
+            alert("Pomodoro complete! Take a break.");
+        });
+    }
+
+    function pauseTimer() {
+        if (endsAt === null) return;
+        stop();
+        remaining = endsAt - Date.now();
+        endsAt = null;
+        updateDisplay(Date.now());
+    }
+
+    function resetTimer() {
+        stop();
+        endsAt = null;
+        remaining = originalDuration * 1000;
+        updateDisplay(Date.now());
+    }
+
+    const actions = {start: startTimer, pause: pauseTimer, reset: resetTimer};
+    for (const button of root.querySelectorAll("[data-action]")) {
+        button.addEventListener("click", actions[button.dataset.action]);
+    }
+
+    updateDisplay(Date.now());
+});
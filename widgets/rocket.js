@@ -0,0 +1,34 @@
+WidgetHost.define("rocket", (root, host) => {
+    const rocket = root.querySelector(".rocket");
+    const overlay = root.querySelector(".overlay");
+    const sound = root.querySelector(".launch-sound");
+    const container = root.querySelector(".rocket-container");
+
+    rocket.addEventListener("click", () => {
+        // Dim background
+        overlay.style.display = "block";
+
+        // Add launch class to animate
+        rocket.classList.add("launch");
+
+        // Play sound
+        sound.currentTime = 0;
+        sound.play();
+
+        // Add smoke puffs every 500ms for 2s
+        for (let puffCount = 1; puffCount <= 4; puffCount++) {
+            host.after(500 * puffCount, () => {
+                const puff = document.createElement("div");
+                puff.classList.add("smoke");
+                container.appendChild(puff);
+                host.after(1000, () => puff.remove());
+            });
+        }
+
+        // Reset after 5s
+        host.after(5000, () => {
+            rocket.classList.remove("launch");
+            overlay.style.display = "none";
+        });
+    });
+});
@@ -0,0 +1,67 @@
+// Live bottom ticker. The content is two identical copies so the -50%
+// scroll loops seamlessly; updates from /ticker/events are patched into both
+// copies in place, so the animation keeps running across updates.
+const HEADLINE_COLORS = ["#FF6347", "#4CAF50", "#2196F3", "#FFD700"];
+
+const content = document.getElementById("ticker-content");
+const template = document.getElementById("ticker-copy");
+for (let i = 0; i < 2; i++) {
+    content.appendChild(template.content.cloneNode(true));
+}
+
+function each(selector, fn) {
+    content.querySelectorAll(selector).forEach(fn);
+}
+
+function setHourly(text) {
+    each(".hourly", (el) => { el.textContent = text; });
+}
+
+function setStocks(spans, fallback) {
+    const html = Object.values(spans).join(" ") || fallback || "";
+    each(".stocks", (el) => { el.innerHTML = html; });
+}
+
+function patchStocks(spans) {
+    for (const [symbol, html] of Object.entries(spans)) {
+        each(`[data-symbol="${CSS.escape(symbol)}"]`, (el) => { el.outerHTML = html; });
+    }
+}
+
+function setHeadlines(headlines) {
+    each(".headlines", (el) => {
+        el.replaceChildren();
+        if (!headlines.length) {
+            el.textContent = "No headlines found.";
+            return;
+        }
+        headlines.forEach((headline, i) => {
+            const span = document.createElement("span");
+            span.style.color = HEADLINE_COLORS[i % HEADLINE_COLORS.length];
+            span.style.marginRight = "30px";
+            span.textContent = headline;
+            el.appendChild(span);
+        });
+    });
+}
+
+function setState(state) {
+    setHourly(state.hourly);
+    setStocks(state.stocks, state.stocks_text);
+    setHeadlines(state.headlines);
+}
+
+// A static export (export.py) embeds the state in the page and has no
+// events route; otherwise the route sits next to /assets/ under the same
+// base path.
+const embedded = document.getElementById("ticker-state");
+if (embedded) {
+    setState(JSON.parse(embedded.textContent));
+} else {
+    const eventsUrl = document.currentScript.src.replace(/assets\/[^/]*$/, "ticker/events");
+    const events = new EventSource(eventsUrl);
+    events.addEventListener("state", (e) => setState(JSON.parse(e.data)));
+    events.addEventListener("hourly", (e) => setHourly(JSON.parse(e.data)));
+    events.addEventListener("stocks", (e) => patchStocks(JSON.parse(e.data)));
+    events.addEventListener("headlines", (e) => setHeadlines(JSON.parse(e.data)));
+}